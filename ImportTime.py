@@ -0,0 +1,48 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Run in a fresh interpreter: time the import and list the GUI modules it pulled in
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps([elapsed, sorted(name for name in ('tkinter', '_tkinter') if name in sys.modules)]))
+"""
+
+_REPO = os.path.dirname(os.path.abspath(__file__))
+
+# Best of repeat fresh-interpreter imports of module: (seconds, GUI modules loaded)
+def measure_import(module="pyamaze", repeat=5):
+    best = None
+    loaded = []
+    for _ in range(repeat):
+        # Run from the repository so the modules are found wherever this is started from
+        output = subprocess.run([sys.executable, "-c", _PROBE.format(module=module)], cwd=_REPO,
+                                capture_output=True, text=True, check=True).stdout
+        elapsed, loaded = json.loads(output)
+        best = elapsed if best is None else min(best, elapsed)
+    return best, loaded
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the import time of the maze modules and check that they do not load tkinter")
+    parser.add_argument("modules", nargs='*', default=["pyamaze", "SearchSolution", "MazeRunner"], help="Modules to import")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module (the best time is kept)")
+    parser.add_argument("--max-ms", type=float, help="Fail when an import takes longer than this")
+
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        elapsed, loaded = measure_import(module, args.repeat)
+        problems = []
+        if loaded:
+            problems.append(f"loads {', '.join(loaded)}")
+        if args.max_ms is not None and elapsed * 1000 > args.max_ms:
+            problems.append(f"slower than {args.max_ms:g} ms")
+        print(f"{module:>16} {elapsed * 1000:8.1f} ms" + (f"  FAIL: {'; '.join(problems)}" if problems else ""))
+        failed = failed or bool(problems)
+    raise SystemExit(1 if failed else 0)
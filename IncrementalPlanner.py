@@ -0,0 +1,181 @@
+import heapq
+
+INF = float('inf')
+
+# (direction, row step, column step, wall bit of the cell, wall bit of the neighbor
+# facing it) in the N, S, W, E order of the SearchSolution neighbors
+_DIRECTIONS = (('N', -1, 0, 4, 8), ('S', 1, 0, 8, 4), ('W', 0, -1, 2, 1), ('E', 0, 1, 1, 2))
+_STEPS = {d: (dr, dc) for d, dr, dc, _, _ in _DIRECTIONS}
+
+class IncrementalPlanner:
+    # Shortest path from start to goal that is kept up to date while walls are
+    # opened and closed, using Lifelong Planning A* (LPA*). The g/rhs values of
+    # the last search are kept, so after a wall change only the cells whose
+    # distance from the start actually changed are expanded again (closing a
+    # wall that cuts off a large region still re-expands that region).
+    # Report changes with wall_changed() (or cells_changed()), or call sync()
+    # to find them by comparing the walls with the last sync; then call plan().
+    # depth, numCreated, numExpanded and maxFringe describe the last plan() call.
+    def __init__(self, maze, start, goal):
+        self.maze = maze
+        self.rows = maze.rows
+        self.cols = maze.cols
+        self.start = tuple(start)
+        self.goal = tuple(goal)
+        self.depth = -1
+        self.numCreated = 0
+        self.numExpanded = 0
+        self.maxFringe = 0
+        self.g = {}  # Distance from the start found by the last search (INF when missing)
+        self.rhs = {self.start: 0}  # One-step lookahead of g
+        self._open = {}  # Inconsistent cells (g != rhs) --> key
+        self._heap = []  # (key, cell), entries whose key no longer matches _open are stale
+        self._changed = set()  # Cells whose walls changed since the last plan()
+        self._walls = maze.packWalls()  # Walls at the last sync()
+        self._map = maze.maze_map
+        self._bits = getattr(self._map, 'bits', None)
+        self._insert(self.start)
+
+    def wall_changed(self, cell, direction):
+        # The wall on the direction ('N', 'S', 'W' or 'E') side of cell was
+        # opened or closed (on one or both sides of the wall)
+        cell = tuple(cell)
+        dr, dc = _STEPS[direction]
+        self._changed.add(cell)
+        neighbor = (cell[0] + dr, cell[1] + dc)
+        if 1 <= neighbor[0] <= self.rows and 1 <= neighbor[1] <= self.cols:
+            self._changed.add(neighbor)
+
+    def cells_changed(self, cells):
+        # Any walls of these cells may have changed
+        for cell in cells:
+            for direction in _STEPS:
+                self.wall_changed(cell, direction)
+
+    def sync(self):
+        # Notify the walls that changed since the last sync (or since the
+        # planner was created) by comparing the packed walls. Chunks that are
+        # still equal are skipped at C speed.
+        walls = self.maze.packWalls()
+        old = self._walls
+        cols = self.cols
+        chunk = 4096
+        for offset in range(0, len(walls), chunk):
+            if walls[offset:offset + chunk] == old[offset:offset + chunk]:
+                continue
+            for i in range(offset, min(offset + chunk, len(walls))):
+                changed = walls[i] ^ old[i]
+                if changed:
+                    cell = (i // cols + 1, i % cols + 1)
+                    for direction, _, _, bit, _ in _DIRECTIONS:
+                        if changed & bit:
+                            self.wall_changed(cell, direction)
+        self._walls = walls
+
+    def plan(self):
+        # Repair the previous search after the notified changes and return the
+        # shortest path from start to goal (None if there is none)
+        self.depth = -1
+        self.numCreated = 0
+        self.numExpanded = 0
+        self.maxFringe = len(self._open)
+        if self.maze.maze_map is not self._map:
+            raise ValueError("maze_map was replaced, create a new IncrementalPlanner")
+        for cell in self._changed:
+            self._update(cell)
+        self._changed.clear()
+        self._compute()
+        if self.g.get(self.goal, INF) == INF:
+            return None
+        return self._path()
+
+    def heuristic(self, cell):
+        # Manhattan distance to the goal
+        return abs(cell[0] - self.goal[0]) + abs(cell[1] - self.goal[1])
+
+    def _key(self, cell):
+        best = min(self.g.get(cell, INF), self.rhs.get(cell, INF))
+        return (best + self.heuristic(cell), best)
+
+    def _insert(self, cell):
+        key = self._key(cell)
+        self._open[cell] = key
+        heapq.heappush(self._heap, (key, cell))
+        self.numCreated += 1
+        if len(self._open) > self.maxFringe:
+            self.maxFringe = len(self._open)
+
+    def _top(self):
+        # Lowest (key, cell) still open, None when nothing is
+        heap = self._heap
+        while heap and self._open.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def _wall_bits(self, cell):
+        if self._bits is not None:
+            return self._bits[(cell[0] - 1) * self.cols + cell[1] - 1]
+        walls = self._map[cell]
+        return (walls['E'] and 1) | (walls['W'] and 2) | (walls['N'] and 4) | (walls['S'] and 8)
+
+    def _successors(self, cell):
+        # Cells reachable in one step through an open wall of cell
+        bits = self._wall_bits(cell)
+        row, col = cell
+        for _, dr, dc, bit, _ in _DIRECTIONS:
+            if bits & bit and 1 <= row + dr <= self.rows and 1 <= col + dc <= self.cols:
+                yield (row + dr, col + dc)
+
+    def _predecessors(self, cell):
+        # Cells that reach cell in one step through one of their open walls
+        row, col = cell
+        for _, dr, dc, _, facing in _DIRECTIONS:
+            neighbor = (row + dr, col + dc)
+            if 1 <= neighbor[0] <= self.rows and 1 <= neighbor[1] <= self.cols and self._wall_bits(neighbor) & facing:
+                yield neighbor
+
+    def _update(self, cell):
+        # Recompute rhs of cell and queue it if it became inconsistent
+        g = self.g
+        if cell != self.start:
+            self.rhs[cell] = min((g.get(p, INF) + 1 for p in self._predecessors(cell)), default=INF)
+        self._open.pop(cell, None)
+        if g.get(cell, INF) != self.rhs.get(cell, INF):
+            self._insert(cell)
+
+    def _compute(self):
+        g, rhs = self.g, self.rhs
+        goal = self.goal
+        while True:
+            top = self._top()
+            if top is None or (top[0] >= self._key(goal) and rhs.get(goal, INF) == g.get(goal, INF)):
+                return
+            cell = heapq.heappop(self._heap)[1]
+            del self._open[cell]
+            self.numExpanded += 1
+            if g.get(cell, INF) > rhs[cell]:
+                g[cell] = rhs[cell]  # Overconsistent: its distance got shorter
+            else:
+                g[cell] = INF  # Underconsistent: its distance got longer, find it again
+                self._update(cell)
+            for successor in self._successors(cell):
+                self._update(successor)
+            if len(self._heap) > 4 * len(self._open) + 1024:  # Drop the stale heap entries
+                self._heap = [(key, c) for c, key in self._open.items()]
+                heapq.heapify(self._heap)
+
+    def _path(self):
+        # Walk back from the goal along predecessors one step closer to the start
+        g = self.g
+        path = [self.goal]
+        cell = self.goal
+        while cell != self.start:
+            distance = g[cell]
+            for p in self._predecessors(cell):
+                if g.get(p, INF) == distance - 1:
+                    cell = p
+                    break
+            path.append(cell)
+        path.reverse()
+        self.depth = len(path) - 1
+        return path
@@ -1,11 +1,34 @@
 import pyamaze as maze
 import random
 import argparse
+import csv
+import json
+import statistics
+import time
+import tracemalloc
 from SearchSolution import SearchSolution
+from SearchProfiler import SearchProfiler
+from ResultsStore import RESULTS_DB, ResultsStore
+
+# Command line name --> SearchSolution method
+SOLVER_METHODS = {
+    'BFS': 'bfs',
+    'DFS': 'dfs',
+    'GS': 'greedy',
+    'AStar': 'astar',
+    'BiBFS': 'bidirectional_bfs',
+    'BiAStar': 'bidirectional_astar',
+    'Wavefront': 'wavefront_bfs',
+    'CorridorDijkstra': 'corridor_dijkstra',
+    'CorridorAStar': 'corridor_astar',
+    'IDAStar': 'ida_star',
+    'SMAStar': 'sma_star',
+}
+SEARCH_METHODS = list(SOLVER_METHODS)
 
 # Create a maze with fixed parameters
-def create_maze(rows, cols):
-    m = maze.maze(rows, cols)
+def create_maze(rows, cols, headless=False):
+    m = maze.maze(rows, cols, headless=headless)
     m.CreateMaze(loopPercent=100, theme=maze.COLOR.light, pattern='vertical')
     return m
 
@@ -13,70 +36,232 @@ def create_maze(rows, cols):
 def get_random_position(rows, cols):
     return random.randint(1, rows), random.randint(1, cols)
 
+# Pick a random start and goal that are not at the same position
+def get_start_goal(rows, cols):
+    start = get_random_position(rows, cols)
+    goal = get_random_position(rows, cols)
+
+    while start == goal:
+        goal = get_random_position(rows, cols)
+
+    return start, goal
+
 # Set up agents with fixed shapes and ensure they are not at the same position
 def setup_agents(m, rows, cols):
-    start_row, start_col = get_random_position(rows, cols)
-    goal_row, goal_col = get_random_position(rows, cols)
-    
-    while (start_row, start_col) == (goal_row, goal_col):
-        goal_row, goal_col = get_random_position(rows, cols)
+    (start_row, start_col), (goal_row, goal_col) = get_start_goal(rows, cols)
 
     start_agent = maze.agent(m, start_row, start_col, shape="arrow", footprints=True)
     goal_agent = maze.agent(m, goal_row, goal_col, shape="square", footprints=True, color=maze.COLOR.red)
     
     return start_agent, goal_agent, (start_row, start_col), (goal_row, goal_col)
 
-# Run the specified search algorithm
-def run_search(m, search_method, start_pos, goal_pos):
-    solver = SearchSolution(m)
-    
-    if search_method == 'BFS':
-        path = solver.bfs(start_pos, goal_pos)
-    elif search_method == 'DFS':
-        path = solver.dfs(start_pos, goal_pos)
-    elif search_method == 'GS':
-        path = solver.greedy(start_pos, goal_pos)
-    elif search_method == 'AStar':
-        path = solver.astar(start_pos, goal_pos)
-    else:
+# Run the specified search algorithm, through a QueryCache when one is given.
+# An observer (e.g. a SearchProfiler) is notified while the solver searches.
+def run_search(m, search_method, start_pos, goal_pos, cache=None, observer=None):
+    if search_method not in SOLVER_METHODS:
         raise ValueError(f"Unknown search method: {search_method}")
-    
+
+    if cache is not None:
+        return cache.search(m, SOLVER_METHODS[search_method], start_pos, goal_pos)
+
+    solver = SearchSolution(m, observer)
+    path = solver.run(SOLVER_METHODS[search_method], start_pos, goal_pos)
+
     return path, solver.depth, solver.numCreated, solver.numExpanded, solver.maxFringe
 
-# Write the search results to a file
-def write_results(size, search_method, depth, num_created, num_expanded, max_fringe):
-    with open("Readme.txt", "a") as file:
-        file.write(f"{size} {search_method}: {depth}, {num_created}, {num_expanded}, {max_fringe}\n")
-        print(f"Written to Readme.txt: {size} {search_method}: {depth}, {num_created}, {num_expanded}, {max_fringe}")
+# Record the search results in the results store
+def write_results(size, search_method, depth, num_created, num_expanded, max_fringe, elapsed=None, store_path=RESULTS_DB, seed=None):
+    store = ResultsStore(store_path)
+    store.record({'size': size, 'seed': seed, 'method': search_method, 'depth': depth, 'numCreated': num_created,
+                  'numExpanded': num_expanded, 'maxFringe': max_fringe, 'time': elapsed})
+    store.close()
+    print(f"Written to {store_path}: {size} {search_method}: {depth}, {num_created}, {num_expanded}, {max_fringe}")
+
+# Parse a "10x10,50x50" list of maze sizes into (rows, cols) pairs
+def parse_sizes(text):
+    sizes = []
+    for size in text.split(','):
+        rows, cols = size.lower().split('x')
+        sizes.append((int(rows), int(cols)))
+    return sizes
+
+# Build the caches a maze keeps for all its searches (the neighbor index of a
+# dictionary maze, the corridor graph) before any of them is timed, so the
+# first method measured on the maze does not pay for them
+def warm_caches(m, methods):
+    solver = SearchSolution(m)
+    if any(SOLVER_METHODS[search_method].startswith('corridor_') for search_method in methods):
+        solver.corridor_graph()
+    if not m.compact:
+        solver.neighbor_index(whole=True)
+
+# Time one search, then repeat it under tracemalloc for the peak memory so
+# tracing does not skew the timings
+def measure(m, search_method, start_pos, goal_pos):
+    started = time.perf_counter()
+    path, depth, num_created, num_expanded, max_fringe = run_search(m, search_method, start_pos, goal_pos)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    run_search(m, search_method, start_pos, goal_pos)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'size': f"{m.rows}x{m.cols}",
+        'method': search_method,
+        'start': start_pos,
+        'goal': goal_pos,
+        'time': elapsed,
+        'peak_memory': peak_memory,
+        'depth': depth,
+        'numCreated': num_created,
+        'numExpanded': num_expanded,
+        'maxFringe': max_fringe,
+    }
+
+# Run every method on the same maze and start/goal pair, once per trial and size
+def benchmark(sizes, methods, trials):
+    records = []
+    for rows, cols in sizes:
+        for trial in range(trials):
+            m = create_maze(rows, cols, headless=True)
+            start_pos, goal_pos = get_start_goal(rows, cols)
+            warm_caches(m, methods)
+            for search_method in methods:
+                records.append({'trial': trial, **measure(m, search_method, start_pos, goal_pos)})
+    return records
+
+# Run every method on every query of a saved scenario corpus
+def replay_corpus(directory, methods):
+    from ScenarioCorpus import load_corpus  # ScenarioCorpus itself imports this module
+    records = []
+    for entry, m, queries in load_corpus(directory):
+        warm_caches(m, methods)
+        for query, (start_pos, goal_pos) in enumerate(queries):
+            for search_method in methods:
+                records.append({'maze': entry['file'], 'seed': entry['seed'], 'query': query,
+                                **measure(m, search_method, start_pos, goal_pos)})
+    return records
+
+# Per size and method mean/median/min/max/stdev of every measured value
+def summarize(records):
+    fields = ['time', 'peak_memory', 'depth', 'numCreated', 'numExpanded', 'maxFringe']
+    groups = {}
+    for record in records:
+        groups.setdefault((record['size'], record['method']), []).append(record)
+
+    summary = []
+    for (size, search_method), group in groups.items():
+        row = {'size': size, 'method': search_method, 'trials': len(group)}
+        for field in fields:
+            values = [record[field] for record in group]
+            row[f'{field}_mean'] = statistics.mean(values)
+            row[f'{field}_median'] = statistics.median(values)
+            row[f'{field}_min'] = min(values)
+            row[f'{field}_max'] = max(values)
+            row[f'{field}_stdev'] = statistics.stdev(values) if len(values) > 1 else 0.0
+        summary.append(row)
+    return summary
+
+# Write the benchmark records and summary as JSON, or as two CSV files
+def write_benchmark(records, summary, output):
+    if output.endswith('.json'):
+        with open(output, "w") as file:
+            json.dump({'runs': records, 'summary': summary}, file, indent=2)
+        print(f"Written to {output}")
+        return
+
+    summary_output = output[:-len('.csv')] + '_summary.csv' if output.endswith('.csv') else output + '_summary.csv'
+    for rows, path in ((records, output), (summary, summary_output)):
+        with open(path, "w", newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"Written to {path}")
+
+# Print a short per size/method table of the summary
+def print_summary(summary):
+    width = max(len(method) for method in SOLVER_METHODS)
+    print(f"{'size':>10} {'method':>{width}} {'time(ms)':>10} {'peak(KB)':>10} {'depth':>8} {'created':>9} {'expanded':>9} {'fringe':>8}")
+    for row in summary:
+        print(f"{row['size']:>10} {row['method']:>{width}} {row['time_mean'] * 1000:>10.2f} {row['peak_memory_mean'] / 1024:>10.1f} "
+              f"{row['depth_mean']:>8.1f} {row['numCreated_mean']:>9.1f} {row['numExpanded_mean']:>9.1f} {row['maxFringe_mean']:>8.1f}")
 
 # Main function to parse arguments and execute the program
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Maze Runner with search algorithms")
-    parser.add_argument("rows", type=int, help="Total number of Maze rows")
-    parser.add_argument("cols", type=int, help="Total number of Maze columns")
-    parser.add_argument("searchmethod", type=str, choices=['BFS', 'DFS', 'GS', 'AStar'], help="Search method to use")
-    
+    parser.add_argument("rows", type=int, nargs='?', help="Total number of Maze rows")
+    parser.add_argument("cols", type=int, nargs='?', help="Total number of Maze columns")
+    parser.add_argument("searchmethod", type=str, nargs='?', choices=SEARCH_METHODS, help="Search method to use")
+    parser.add_argument("--headless", action="store_true", help="Generate and solve the maze without opening a window")
+    parser.add_argument("--trials", type=int, help="Benchmark mode: number of mazes to generate per size")
+    parser.add_argument("--methods", type=str, default=','.join(SEARCH_METHODS), help="Benchmark mode: comma separated search methods")
+    parser.add_argument("--sizes", type=str, default="10x10,50x50", help="Benchmark mode: comma separated ROWSxCOLS maze sizes")
+    parser.add_argument("--output", type=str, default="benchmark.csv", help="Benchmark mode: .csv or .json results file")
+    parser.add_argument("--store", type=str, default=RESULTS_DB, help="Results database every run is recorded in")
+    parser.add_argument("--seed", type=int, help="Seed the random module so the mazes and positions can be reproduced")
+    parser.add_argument("--corpus", type=str, help="Replay mode: run --methods on every query of a ScenarioCorpus directory")
+    parser.add_argument("--profile", action="store_true", help="Print a profile of the search (node counts, phases, memory)")
+
     args = parser.parse_args()
-    
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    if args.trials is not None and args.trials < 1:
+        parser.error("--trials must be at least 1")
+
+    if args.trials is not None or args.corpus is not None:
+        methods = args.methods.split(',')
+        for search_method in methods:
+            if search_method not in SEARCH_METHODS:
+                parser.error(f"Unknown search method: {search_method}")
+        if args.corpus is not None:
+            records = replay_corpus(args.corpus, methods)
+        else:
+            records = benchmark(parse_sizes(args.sizes), methods, args.trials)
+        if not records:
+            print("No runs to record")
+            raise SystemExit
+        summary = summarize(records)
+        write_benchmark(records, summary, args.output)
+        store = ResultsStore(args.store)
+        store.record_many(records)
+        store.close()
+        print_summary(summary)
+        raise SystemExit
+
+    if args.rows is None or args.cols is None or args.searchmethod is None:
+        parser.error("rows, cols and searchmethod are required unless --trials or --corpus is given")
+
     maze_rows, maze_cols = args.rows, args.cols
     search_method = args.searchmethod
     
     #Create the maze
-    m = create_maze(maze_rows, maze_cols)
+    m = create_maze(maze_rows, maze_cols, headless=args.headless)
     
     #Setup agents and their start and goal positions
     start_agent, goal_agent, start_position, goal_position = setup_agents(m, maze_rows, maze_cols)
     
     #Run the selected search algorithm
+    started = time.perf_counter()
     path, depth, num_created, num_expanded, max_fringe = run_search(m, search_method, start_position, goal_position)
+    elapsed = time.perf_counter() - started
+    if args.profile:
+        # Profiled in a second run, as measure() does for the peak memory: the
+        # tracing and callbacks would skew the recorded time
+        profiler = SearchProfiler()
+        run_search(m, search_method, start_position, goal_position, observer=profiler)
+        print(profiler.report())
     
     #Trace the path if found
     if path:
         m.tracePath({start_agent: path}, delay=100)
     
-    # Write the results to the file
+    # Record the results
     size = f"{maze_rows}x{maze_cols}"
-    write_results(size, search_method, depth, num_created, num_expanded, max_fringe)
+    write_results(size, search_method, depth, num_created, num_expanded, max_fringe, elapsed, args.store, args.seed)
     
     #  Run the maze GUI
     m.run()
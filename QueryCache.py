@@ -0,0 +1,89 @@
+from collections import OrderedDict  # Import OrderedDict for the LRU order
+import json
+import sqlite3
+from SearchSolution import SearchSolution
+
+class QueryCache:
+    # Memoizes SearchSolution queries by (maze fingerprint, start, goal, method).
+    # The fingerprint is a hash of the maze walls, so once maze_map changes the
+    # old entries simply stop matching and are aged out by the LRU.
+    def __init__(self, maxsize=1024, path=None):
+        # maxsize bounds the in-memory LRU. With a path, results are also kept
+        # in an SQLite file shared by every process that opens it.
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path, timeout=30)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS queries (key TEXT PRIMARY KEY, result TEXT NOT NULL)")
+            self._db.commit()
+
+    def search(self, maze, method, start, goal):
+        # Run (or recall) SearchSolution.<method>(start, goal) on the maze and
+        # return (path, depth, numCreated, numExpanded, maxFringe)
+        if method not in SearchSolution.ALGORITHMS:
+            raise ValueError(f"Unknown search method: {method}")
+        key = (maze.fingerprint(), tuple(start), tuple(goal), method)
+
+        result = self._entries.get(key)
+        if result is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._copy(result)
+
+        if self._db is not None:
+            row = self._db.execute("SELECT result FROM queries WHERE key = ?", (json.dumps(key),)).fetchone()
+            if row is not None:
+                path, *metrics = json.loads(row[0])
+                result = (None if path is None else tuple(tuple(cell) for cell in path), *metrics)
+                self._remember(key, result)
+                self.hits += 1
+                self.disk_hits += 1
+                return self._copy(result)
+
+        self.misses += 1
+        solver = SearchSolution(maze)
+        path = getattr(solver, method)(tuple(start), tuple(goal))
+        result = (None if path is None else tuple(path), solver.depth, solver.numCreated, solver.numExpanded, solver.maxFringe)
+        self._remember(key, result)
+        if self._db is not None:
+            self._db.execute("INSERT OR REPLACE INTO queries VALUES (?, ?)", (json.dumps(key), json.dumps(result)))
+            self._db.commit()
+        return self._copy(result)
+
+    def stats(self):
+        # Counters for tuning the cache size
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'disk_hits': self.disk_hits,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+        }
+
+    def clear(self):
+        # Drop the in-memory entries and reset the counters (the disk file is kept)
+        self._entries.clear()
+        self.hits = self.misses = self.disk_hits = 0
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _remember(self, key, result):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _copy(self, result):
+        # Callers get their own path list, so changing it cannot change the cached result
+        path, *metrics = result
+        return (None if path is None else list(path), *metrics)
@@ -0,0 +1,118 @@
+import argparse
+import datetime
+import re
+import socket
+import sqlite3
+
+RESULTS_DB = "results.db"
+
+# Columns of one recorded run, besides the id, timestamp and host filled in by the store
+FIELDS = ['size', 'seed', 'method', 'depth', 'numCreated', 'numExpanded', 'maxFringe', 'time', 'peak_memory']
+METRICS = ['depth', 'numCreated', 'numExpanded', 'maxFringe', 'time', 'peak_memory']
+
+class ResultsStore:
+    # SQLite results store in WAL mode, so any number of processes can record
+    # runs into the same file while others read it
+    def __init__(self, path=RESULTS_DB):
+        self.path = path
+        self.host = socket.gethostname()
+        self._db = sqlite3.connect(path, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY,
+            recorded_at TEXT NOT NULL,
+            host TEXT NOT NULL,
+            size TEXT NOT NULL,
+            rows INTEGER NOT NULL,
+            cols INTEGER NOT NULL,
+            seed INTEGER,
+            method TEXT NOT NULL,
+            depth INTEGER NOT NULL,
+            numCreated INTEGER NOT NULL,
+            numExpanded INTEGER NOT NULL,
+            maxFringe INTEGER NOT NULL,
+            time REAL,
+            peak_memory INTEGER)""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS runs_size_method ON runs (size, method)")
+        self._db.commit()
+
+    def record(self, run):
+        # Record one run: a dict with the FIELDS keys (seed, time and peak_memory may be missing)
+        self.record_many([run])
+
+    def record_many(self, runs):
+        # Record a batch of runs in a single transaction
+        recorded_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        rows = []
+        for run in runs:
+            size_rows, size_cols = run['size'].lower().split('x')
+            rows.append((recorded_at, run.get('host', self.host), run['size'], int(size_rows), int(size_cols))
+                        + tuple(run.get(field) for field in FIELDS[1:]))
+        with self._db:
+            self._db.executemany("""INSERT INTO runs (recorded_at, host, size, rows, cols, seed, method, depth,
+                numCreated, numExpanded, maxFringe, time, peak_memory) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""", rows)
+
+    def aggregate(self, percentiles=(50, 90, 99), metrics=METRICS):
+        # Per size/method count, mean and percentiles of every metric
+        summary = []
+        groups = self._db.execute("SELECT size, method FROM runs GROUP BY size, method ORDER BY rows * cols, size, method").fetchall()
+        for size, search_method in groups:
+            row = {'size': size, 'method': search_method}
+            for metric in metrics:
+                values = [value for (value,) in self._db.execute(
+                    f"SELECT {metric} FROM runs WHERE size = ? AND method = ? AND {metric} IS NOT NULL ORDER BY {metric}",
+                    (size, search_method))]
+                row['runs'] = max(row.get('runs', 0), len(values))
+                row[f'{metric}_mean'] = sum(values) / len(values) if values else None
+                for p in percentiles:
+                    row[f'{metric}_p{p}'] = percentile(values, p)
+            summary.append(row)
+        return summary
+
+    def close(self):
+        self._db.close()
+
+# Nearest-rank percentile of an already sorted list (None when empty)
+def percentile(values, p):
+    if not values:
+        return None
+    rank = max(1, -(-len(values) * p // 100))
+    return values[min(rank, len(values)) - 1]
+
+# Read the "50x50 BFS: 29, 1952, 1400, 128" lines MazeRunner used to append to Readme.txt
+def read_legacy_results(path):
+    runs = []
+    line_format = re.compile(r"^(\d+x\d+) (\w+): (-?\d+), (\d+), (\d+), (\d+)$")
+    with open(path, "r") as file:
+        for line in file:
+            match = line_format.match(line.strip())
+            if match:
+                size, search_method, depth, num_created, num_expanded, max_fringe = match.groups()
+                runs.append({'size': size, 'method': search_method, 'depth': int(depth), 'numCreated': int(num_created),
+                             'numExpanded': int(num_expanded), 'maxFringe': int(max_fringe)})
+    return runs
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per size/method percentiles of the recorded search runs")
+    parser.add_argument("database", nargs='?', default=RESULTS_DB, help="Results database")
+    parser.add_argument("--metric", type=str, default="numExpanded", choices=METRICS, help="Metric to report")
+    parser.add_argument("--percentiles", type=str, default="50,90,99", help="Comma separated percentiles")
+    parser.add_argument("--import-legacy", type=str, metavar="README", help="Import the runs of an old Readme.txt first")
+
+    args = parser.parse_args()
+
+    store = ResultsStore(args.database)
+    if args.import_legacy:
+        runs = read_legacy_results(args.import_legacy)
+        store.record_many(runs)
+        print(f"Imported {len(runs)} runs from {args.import_legacy}")
+
+    percentiles = [int(p) for p in args.percentiles.split(',')]
+    header = f"{'size':>10} {'method':>16} {'runs':>6} {'mean':>12}" + ''.join(f" {'p' + str(p):>12}" for p in percentiles)
+    print(header)
+    for row in store.aggregate(percentiles, [args.metric]):
+        if row['runs'] == 0:
+            continue
+        values = [row[f'{args.metric}_mean']] + [row[f'{args.metric}_p{p}'] for p in percentiles]
+        print(f"{row['size']:>10} {row['method']:>16} {row['runs']:>6}" + ''.join(f" {value:>12.4g}" for value in values))
+    store.close()
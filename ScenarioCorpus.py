@@ -0,0 +1,63 @@
+import argparse
+import json
+import os
+import random
+import pyamaze as maze
+from MazeRunner import create_maze, get_start_goal, parse_sizes
+
+MANIFEST = "corpus.json"
+
+# Generate a corpus directory: mazes_per_size mazes of every size, each saved in the
+# binary maze format, plus queries_per_maze start/goal pairs per maze in the manifest.
+# Everything derives from seed, so the same arguments always give the same corpus.
+def generate_corpus(directory, seed, sizes, mazes_per_size, queries_per_maze):
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    entries = []
+    for rows, cols in sizes:
+        for _ in range(mazes_per_size):
+            maze_seed = rng.getrandbits(32)
+            random.seed(maze_seed)  # pyamaze generates with the global random module
+            m = create_maze(rows, cols, headless=True)
+            queries = [get_start_goal(rows, cols) for _ in range(queries_per_maze)]
+
+            file_name = f"maze-{len(entries):04d}.maze"
+            m.saveBinary(os.path.join(directory, file_name))
+            entries.append({
+                'file': file_name,
+                'rows': rows,
+                'cols': cols,
+                'seed': maze_seed,
+                'fingerprint': m.fingerprint(),
+                'queries': [[*start, *goal] for start, goal in queries],
+            })
+
+    with open(os.path.join(directory, MANIFEST), "w") as file:
+        json.dump({'seed': seed, 'mazes': entries}, file, indent=1)
+    return entries
+
+# Yield (entry, maze, [(start, goal), ...]) for every maze of a corpus, loading
+# the saved walls instead of generating them again
+def load_corpus(directory):
+    with open(os.path.join(directory, MANIFEST), "r") as file:
+        manifest = json.load(file)
+    for entry in manifest['mazes']:
+        m = maze.maze(headless=True, compact=True)
+        m.CreateMaze(loadMaze=os.path.join(directory, entry['file']), theme=maze.COLOR.light)
+        if m.fingerprint() != entry['fingerprint']:
+            raise ValueError(f"{entry['file']} does not match the corpus manifest")
+        queries = [((q[0], q[1]), (q[2], q[3])) for q in entry['queries']]
+        yield entry, m, queries
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a reproducible corpus of seeded mazes and start/goal queries")
+    parser.add_argument("directory", type=str, help="Directory to write the corpus to")
+    parser.add_argument("--seed", type=int, required=True, help="Corpus seed")
+    parser.add_argument("--sizes", type=str, default="10x10,50x50", help="Comma separated ROWSxCOLS maze sizes")
+    parser.add_argument("--mazes", type=int, default=10, help="Number of mazes per size")
+    parser.add_argument("--queries", type=int, default=10, help="Number of start/goal pairs per maze")
+
+    args = parser.parse_args()
+
+    entries = generate_corpus(args.directory, args.seed, parse_sizes(args.sizes), args.mazes, args.queries)
+    print(f"Written {len(entries)} mazes to {args.directory}")
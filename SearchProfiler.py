@@ -0,0 +1,108 @@
+import time
+from SearchSolution import SearchObserver
+
+class SearchProfiler(SearchObserver):
+    # SearchObserver collecting a profile of every search it watches: node
+    # counts, expansion rate over time, the fringe size profile, time spent in
+    # each phase (index/graph building, path reconstruction) and peak memory.
+    # Samples are taken every sample_every expansions to keep the overhead low.
+    # Searches called directly instead of through SearchSolution.run (and
+    # distance_field or corridor_graph) do not report a start, so their
+    # callbacks open a profile without method, start and goal, which the
+    # next search_started replaces and search_finished records.
+    def __init__(self, trace_memory=True, sample_every=100):
+        self.trace_memory = trace_memory
+        self.sample_every = sample_every
+        self.profiles = []  # One dict per finished search
+        self._current = None
+
+    def search_started(self, method, start, goal):
+        self._current = {
+            'method': method,
+            'start': start,
+            'goal': goal,
+            'created': 0,
+            'expanded': 0,
+            'fringe': 0,
+            'samples': [],  # (seconds since the start, nodes expanded, fringe size)
+            'phases': {},  # phase name --> seconds
+            'started': time.perf_counter(),
+        }
+
+    def _profile(self):
+        # The profile being recorded, opened on the first callback if needed
+        if self._current is None:
+            self.search_started(None, None, None)
+        return self._current
+
+    def node_created(self, cell):
+        (self._current or self._profile())['created'] += 1
+
+    def node_expanded(self, cell):
+        current = self._current or self._profile()
+        current['expanded'] += 1
+        if current['expanded'] % self.sample_every == 0:
+            current['samples'].append((time.perf_counter() - current['started'], current['expanded'], current['fringe']))
+
+    def fringe_size(self, size):
+        (self._current or self._profile())['fringe'] = size
+
+    def phase(self, name):
+        return _PhaseTimer((self._current or self._profile())['phases'], name)
+
+    def search_finished(self, solver, path, elapsed, peak_memory):
+        current = self._profile()
+        phases = current['phases']
+        search_time = elapsed - sum(phases.values())
+        self.profiles.append({
+            'method': current['method'],
+            'start': current['start'],
+            'goal': current['goal'],
+            'found': path is not None,
+            'depth': solver.depth,
+            'numCreated': solver.numCreated,
+            'numExpanded': solver.numExpanded,
+            'maxFringe': solver.maxFringe,
+            'time': elapsed,
+            'search_time': search_time,
+            'expansions_per_second': current['expanded'] / search_time if search_time > 0 else None,
+            'phases': dict(phases),
+            'peak_memory': peak_memory,
+            'samples': current['samples'],
+        })
+        self._current = None
+
+    def report(self):
+        # Human readable summary of every recorded profile
+        lines = []
+        for profile in self.profiles:
+            lines.append(f"{profile['method']} {profile['start']} -> {profile['goal']}: "
+                         f"{'found' if profile['found'] else 'no path'}, depth {profile['depth']}")
+            lines.append(f"  nodes: {profile['numCreated']} created, {profile['numExpanded']} expanded, "
+                         f"max fringe {profile['maxFringe']}")
+            rate = profile['expansions_per_second']
+            lines.append(f"  time: {profile['time'] * 1000:.2f} ms total, {profile['search_time'] * 1000:.2f} ms searching"
+                         + (f" ({rate:,.0f} expansions/s)" if rate else ""))
+            for name, seconds in profile['phases'].items():
+                lines.append(f"  phase {name}: {seconds * 1000:.2f} ms")
+            if profile['peak_memory'] is not None:
+                lines.append(f"  peak memory: {profile['peak_memory'] / 1024:.1f} KB")
+            if profile['samples']:
+                fringes = [fringe for _, _, fringe in profile['samples']]
+                lines.append(f"  fringe over {len(fringes)} samples: min {min(fringes)}, "
+                             f"mean {sum(fringes) / len(fringes):.1f}, max {max(fringes)}")
+        return "\n".join(lines)
+
+class _PhaseTimer:
+    # Adds the time spent inside the with block to phases[name]
+    __slots__ = ('phases', 'name', 'started')
+
+    def __init__(self, phases, name):
+        self.phases = phases
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.phases[self.name] = self.phases.get(self.name, 0.0) + time.perf_counter() - self.started
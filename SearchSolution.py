@@ -1,10 +1,253 @@
-from collections import deque  # Import deque for BFS
+from collections import deque, OrderedDict  # Import deque for BFS
+from array import array  # Import array for the compact neighbor index offsets
+import contextlib
 import heapq  # Import heapq for priority queue operations in Greedy and A* search
+import itertools
+import time
+import tracemalloc
+import weakref
+
+# Neighbor index of every dictionary maze searched so far: maze --> (maze_map, version, size, offsets, targets),
+# offsets is None while the walls are still read lazily through targets (a _DictNeighbors)
+_NEIGHBOR_INDEX = weakref.WeakKeyDictionary()
+# Recent distance fields of every maze: maze --> (maze_map, version, size, OrderedDict goal --> DistanceField)
+_DISTANCE_FIELDS = weakref.WeakKeyDictionary()
+# Corridor graph of every maze searched with it: maze --> (maze_map, version, size, CorridorGraph)
+_CORRIDOR_GRAPHS = weakref.WeakKeyDictionary()
+
+def _version(maze_map):
+    # Key of the current walls of maze_map for the caches above. A map that
+    # cannot count its changes (a plain dict, a wallDict holding cells it does
+    # not own) gets a new key every time, so nothing about it is ever reused.
+    version = getattr(maze_map, 'version', None)
+    return object() if version is None else version
+
+# Shared do-nothing phase timer used when a solver has no observer
+_NO_PHASE = contextlib.nullcontext()
+
+class SearchObserver:
+    # Base class of the objects SearchSolution reports to while it searches.
+    # Subclasses override the callbacks they need; the per-node ones
+    # (node_created, node_expanded, fringe_size) that are left as they are here
+    # are never called, so an observer only pays for what it listens to.
+    # Set trace_memory to have SearchSolution.run measure the peak memory.
+    trace_memory = False
+
+    def search_started(self, method, start, goal):
+        pass
+
+    def node_created(self, cell):
+        pass
+
+    def node_expanded(self, cell):
+        pass
+
+    def fringe_size(self, size):
+        # Fringe size after each expansion (after each layer for wavefront_bfs)
+        pass
+
+    def phase(self, name):
+        # Context manager around one phase of a search: 'neighbor_index',
+        # 'corridor_graph', 'distance_field' or 'path'
+        return _NO_PHASE
+
+    def search_finished(self, solver, path, elapsed, peak_memory):
+        # elapsed is in seconds, peak_memory in bytes (None unless trace_memory)
+        pass
+
+class _TreeOrder:
+    # Heap tie-breaker standing in for the old per-entry path list. Two fringe
+    # entries only reach this comparison when they share the same priority and
+    # cell, and then they must order exactly as their parents' paths used to.
+    __slots__ = ('cell', 'parents')
+
+    def __init__(self, cell, parents):
+        self.cell = cell
+        self.parents = parents
+
+    def _path(self):
+        path = []
+        cell = self.cell
+        while cell is not None:
+            path.append(cell)
+            cell = self.parents[cell]
+        path.reverse()
+        return path
+
+    def __lt__(self, other):
+        return self._path() < other._path()
+
+class _SMANode:
+    # Search tree node of sma_star. f is the cost bound of a leaf: its own f,
+    # raised to the lowest f among the successors not (or no longer) in memory
+    # once it has none left in memory. Those successors are kept in pending as
+    # (f, cell); pending is None until the node's successors are first generated.
+    __slots__ = ('cell', 'g', 'f', 'depth', 'parent', 'children', 'pending', 'alive')
+
+    def __init__(self, cell, g, f, depth, parent):
+        self.cell = cell
+        self.g = g
+        self.f = f
+        self.depth = depth
+        self.parent = parent
+        self.children = []
+        self.pending = None
+        self.alive = True
+
+class DistanceField:
+    # Result of one BFS from a goal over the whole maze: the distance of every
+    # cell to the goal and the next cell to step to. Cells are stored by id
+    # (row - 1) * cols + (col - 1); -1 marks unreachable cells (and the goal's next hop).
+    def __init__(self, goal, rows, cols, distances, next_hops):
+        self.goal = goal
+        self.rows = rows
+        self.cols = cols
+        self.distances = distances
+        self.next_hops = next_hops
+
+    def distance(self, cell):
+        # Number of steps from cell to the goal, or -1 if the goal cannot be reached
+        return self.distances[(cell[0] - 1) * self.cols + cell[1] - 1]
+
+    def next_hop(self, cell):
+        # The neighbor of cell one step closer to the goal (None at the goal or if unreachable)
+        hop = self.next_hops[(cell[0] - 1) * self.cols + cell[1] - 1]
+        if hop < 0:
+            return None
+        return (hop // self.cols + 1, hop % self.cols + 1)
+
+    def path_from(self, start):
+        # Shortest path from start to the goal in O(path length), None if unreachable
+        cols = self.cols
+        i = (start[0] - 1) * cols + start[1] - 1
+        if self.distances[i] < 0:
+            return None
+        path = [tuple(start)]
+        i = self.next_hops[i]
+        while i >= 0:
+            path.append((i // cols + 1, i % cols + 1))
+            i = self.next_hops[i]
+        return path
+
+class CorridorGraph:
+    # The maze with every corridor of degree-2 cells contracted into one
+    # weighted edge. Nodes are junctions, dead ends and isolated cells (plus one
+    # cell of any corridor that loops back on itself without a junction).
+    # Each edge is stored as (target, weight, first cell after the node), which
+    # is enough to walk the corridor again when expanding a path.
+    def __init__(self, offsets, targets, cols):
+        self.offsets = offsets
+        self.targets = targets
+        self.cols = cols
+        self.edges = {}  # node --> [(target, weight, first), ...]
+        cells = len(offsets) - 1
+        for i in range(cells):
+            if offsets[i + 1] - offsets[i] != 2:
+                self.edges[(i // cols + 1, i % cols + 1)] = []
+
+        seen = bytearray(cells)  # Corridor cells reached from some node
+        for node in list(self.edges):
+            self._connect(node, seen)
+        for i in range(cells):
+            if not seen[i] and offsets[i + 1] - offsets[i] == 2:
+                # A ring of corridor cells: make one of them a node
+                node = (i // cols + 1, i % cols + 1)
+                self.edges[node] = []
+                self._connect(node, seen)
+
+    def _connect(self, node, seen):
+        cols = self.cols
+        seen[(node[0] - 1) * cols + node[1] - 1] = 1
+        for first in self.neighbors(node):
+            end, weight, _ = self.walk(node, first, seen=seen)
+            if end != node:
+                self.edges[node].append((end, weight, first))
+
+    def neighbors(self, cell):
+        i = (cell[0] - 1) * self.cols + cell[1] - 1
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def walk(self, cell, first, stops=(), seen=None):
+        # Follow the corridor from cell through first until a node or a cell in
+        # stops. Returns (end, number of steps, cell just before end).
+        cols = self.cols
+        previous, current, weight = cell, first, 1
+        while current not in self.edges and current not in stops:
+            if seen is not None:
+                seen[(current[0] - 1) * cols + current[1] - 1] = 1
+            a, b = self.neighbors(current)
+            previous, current = current, (b if a == previous else a)
+            weight += 1
+        return current, weight, previous
+
+    def expand(self, cell, first, end):
+        # The cells of the corridor from cell (excluded) through first up to end
+        cells = [first]
+        previous, current = cell, first
+        while current != end:
+            a, b = self.neighbors(current)
+            previous, current = current, (b if a == previous else a)
+            cells.append(current)
+        return cells
+
+class _LazyNeighbors:
+    # targets of a neighbor index that stores nothing: with offsets
+    # range(0, 4 * (cells + 1), 4) every cell id owns the four slots
+    # 4 * id .. 4 * id + 3, and slicing them reads the wall bits of the cell
+    # (cell_bits(id), E=1 W=2 N=4 S=8) and returns its neighbors in the N, S,
+    # W, E order of the CSR index. Edits to the walls are seen at once.
+    __slots__ = ('cell_bits', 'rows', 'cols')
+
+    def __init__(self, cell_bits, rows, cols):
+        self.cell_bits = cell_bits
+        self.rows = rows
+        self.cols = cols
+
+    def __getitem__(self, slots):
+        i = slots.start >> 2
+        b = self.cell_bits(i)
+        row, col = i // self.cols + 1, i % self.cols + 1
+        neighbors = []
+        if b & 4 and row > 1:
+            neighbors.append((row - 1, col))
+        if b & 8 and row < self.rows:
+            neighbors.append((row + 1, col))
+        if b & 2 and col > 1:
+            neighbors.append((row, col - 1))
+        if b & 1 and col < self.cols:
+            neighbors.append((row, col + 1))
+        return neighbors
+
+class _DictNeighbors(_LazyNeighbors):
+    # lazy targets of a dictionary maze, counting the cells read so that
+    # neighbor_index knows when building the CSR index has paid for itself
+    __slots__ = ('reads',)
+
+    def __init__(self, maze_map, rows, cols):
+        def cell_bits(i):
+            walls = maze_map[i // cols + 1, i % cols + 1]
+            return (walls['E'] and 1) | (walls['W'] and 2) | (walls['N'] and 4) | (walls['S'] and 8)
+        super().__init__(cell_bits, rows, cols)
+        self.reads = 0
+
+    def __getitem__(self, slots):
+        self.reads += 1
+        return _LazyNeighbors.__getitem__(self, slots)
 
 class SearchSolution:
-    def __init__(self, maze):
-        # Initialize the search solution with the maze and initial values for metrics
+    # Search methods taking (start, goal) and filling in the metrics
+    ALGORITHMS = ('bfs', 'dfs', 'greedy', 'astar', 'bidirectional_bfs', 'bidirectional_astar', 'wavefront_bfs',
+                  'corridor_dijkstra', 'corridor_astar', 'ida_star', 'sma_star')
+    # Number of goals whose distance field is kept per maze
+    DISTANCE_FIELD_CACHE_SIZE = 8
+    # Default node limit of the memory-bounded searches (ida_star, sma_star)
+    NODE_LIMIT = 100000
+
+    def __init__(self, maze, observer=None):
+        # Initialize the search solution with the maze and initial values for metrics.
+        # observer is an optional SearchObserver notified while searching.
         self.maze = maze
+        self.observer = observer
         self.rows = maze.rows
         self.cols = maze.cols
         self.depth = -1
@@ -19,52 +262,119 @@ class SearchSolution:
         self.numExpanded = 0
         self.maxFringe = 0
 
+    def run(self, method, start, goal):
+        # Run one of the ALGORITHMS by name, reporting its start, duration and
+        # (if the observer asks for it) peak memory to the observer
+        if method not in self.ALGORITHMS:
+            raise ValueError(f"Unknown search method: {method}")
+        search = getattr(self, method)
+        observer = self.observer
+        if observer is None:
+            return search(start, goal)
+
+        observer.search_started(method, start, goal)
+        tracing = observer.trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            path = search(start, goal)
+            elapsed = time.perf_counter() - started
+            peak_memory = tracemalloc.get_traced_memory()[1] if tracing else None
+        finally:
+            if tracing:
+                tracemalloc.stop()
+        observer.search_finished(self, path, elapsed, peak_memory)
+        return path
+
+    def _hooks(self):
+        # The observer's (node_created, node_expanded, fringe_size) callbacks,
+        # None for each one it does not override. The search loops test these
+        # locals, so a search without an observer only pays a falsy check.
+        observer = self.observer
+        if observer is None:
+            return None, None, None
+        return tuple(None if getattr(type(observer), name) is getattr(SearchObserver, name) else getattr(observer, name)
+                     for name in ('node_created', 'node_expanded', 'fringe_size'))
+
+    def _phase(self, name):
+        # Time a phase with the observer (a shared no-op context without one)
+        if self.observer is None:
+            return _NO_PHASE
+        return self.observer.phase(name)
+
     def bfs(self, start, goal):
         # Breadth-First Search (BFS) algorithm implementation
         self.reset_metrics()
-        queue = deque([(start, [])])  # Queue for BFS, storing (current position, path)
-        visited = set()  # Set to keep track of visited nodes
+        offsets, targets = self.neighbor_index()
+        cols = self.cols
+        queue = deque([(start, None)])  # Queue for BFS, storing (current position, parent)
+        parents = {}  # Parent link of every expanded node, doubles as the visited set
+        created, expanded, fringe = self._hooks()
         self.numCreated += 1
+        self.maxFringe = 1
+        if created:
+            created(start)
 
         while queue:
-            self.maxFringe = max(self.maxFringe, len(queue))  # Update max fringe size
-            current, path = queue.popleft()  # Dequeue the front element
-            if current in visited:
+            current, parent = queue.popleft()  # Dequeue the front element
+            if current in parents:
                 continue
-            visited.add(current)  # Mark the current node as visited
+            parents[current] = parent  # Mark the current node as visited
             self.numExpanded += 1
-            path = path + [current]  # Append current position to the path
+            if expanded:
+                expanded(current)
             if current == goal:  # Goal check
-                self.depth = len(path) - 1
-                return path
-            for neighbor in self.get_neighbors(current):  # Explore neighbors
-                if neighbor not in visited:
-                    queue.append((neighbor, path))
+                return self.reconstruct_path(parents, goal)
+            i = (current[0] - 1) * cols + current[1] - 1
+            for neighbor in targets[offsets[i]:offsets[i + 1]]:  # Explore neighbors
+                if neighbor not in parents:
+                    queue.append((neighbor, current))
                     self.numCreated += 1
+                    if created:
+                        created(neighbor)
+            size = len(queue)  # The fringe only grows here, so this is where max fringe is reached
+            if size > self.maxFringe:
+                self.maxFringe = size
+            if fringe:
+                fringe(size)
         return None
 
     def dfs(self, start, goal):
         # Depth-First Search (DFS) algorithm implementation
         self.reset_metrics()
-        stack = [(start, [])]  # Stack for DFS, storing (current position, path)
-        visited = set()  # Set to keep track of visited nodes
+        offsets, targets = self.neighbor_index()
+        cols = self.cols
+        stack = [(start, None)]  # Stack for DFS, storing (current position, parent)
+        parents = {}  # Parent link of every expanded node, doubles as the visited set
+        created, expanded, fringe = self._hooks()
         self.numCreated += 1
+        self.maxFringe = 1
+        if created:
+            created(start)
 
         while stack:
-            self.maxFringe = max(self.maxFringe, len(stack))  # Update max fringe size
-            current, path = stack.pop()  # Pop the top element
-            if current in visited:
+            current, parent = stack.pop()  # Pop the top element
+            if current in parents:
                 continue
-            visited.add(current)  # Mark the current node as visited
+            parents[current] = parent  # Mark the current node as visited
             self.numExpanded += 1
-            path = path + [current]  # Append current position to the path
+            if expanded:
+                expanded(current)
             if current == goal:  # Goal check
-                self.depth = len(path) - 1
-                return path
-            for neighbor in self.get_neighbors(current):  # Explore neighbors
-                if neighbor not in visited:
-                    stack.append((neighbor, path))
+                return self.reconstruct_path(parents, goal)
+            i = (current[0] - 1) * cols + current[1] - 1
+            for neighbor in targets[offsets[i]:offsets[i + 1]]:  # Explore neighbors
+                if neighbor not in parents:
+                    stack.append((neighbor, current))
                     self.numCreated += 1
+                    if created:
+                        created(neighbor)
+            size = len(stack)  # The fringe only grows here, so this is where max fringe is reached
+            if size > self.maxFringe:
+                self.maxFringe = size
+            if fringe:
+                fringe(size)
         return None
 
     def greedy(self, start, goal):
@@ -75,26 +385,40 @@ class SearchSolution:
         def heuristic(a, b):
             return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
+        offsets, targets = self.neighbor_index()
+        cols = self.cols
         queue = []
-        heapq.heappush(queue, (0, start, []))  # Priority queue for Greedy search
-        visited = set()
+        parents = {}  # Parent link of every expanded node, doubles as the visited set
+        heapq.heappush(queue, (0, start, _TreeOrder(None, parents)))  # Priority queue for Greedy search
+        created, expanded, fringe = self._hooks()
         self.numCreated += 1
+        self.maxFringe = 1
+        if created:
+            created(start)
 
         while queue:
-            self.maxFringe = max(self.maxFringe, len(queue))
-            cost, current, path = heapq.heappop(queue)
-            if current in visited:
+            cost, current, parent = heapq.heappop(queue)
+            if current in parents:
                 continue
-            visited.add(current)
+            parents[current] = parent.cell
             self.numExpanded += 1
-            path = path + [current]
+            if expanded:
+                expanded(current)
             if current == goal:
-                self.depth = len(path) - 1
-                return path
-            for neighbor in self.get_neighbors(current):
-                if neighbor not in visited:
-                    heapq.heappush(queue, (heuristic(neighbor, goal), neighbor, path))
+                return self.reconstruct_path(parents, goal)
+            parent = _TreeOrder(current, parents)
+            i = (current[0] - 1) * cols + current[1] - 1
+            for neighbor in targets[offsets[i]:offsets[i + 1]]:
+                if neighbor not in parents:
+                    heapq.heappush(queue, (heuristic(neighbor, goal), neighbor, parent))
                     self.numCreated += 1
+                    if created:
+                        created(neighbor)
+            size = len(queue)
+            if size > self.maxFringe:
+                self.maxFringe = size
+            if fringe:
+                fringe(size)
         return None
 
     def astar(self, start, goal):
@@ -105,42 +429,710 @@ class SearchSolution:
         def heuristic(a, b):
             return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
+        offsets, targets = self.neighbor_index()
+        cols = self.cols
         queue = []
-        heapq.heappush(queue, (0, start, []))  # Priority queue for A* search
-        visited = set()
+        parents = {}  # Parent link of every expanded node, doubles as the visited set
+        heapq.heappush(queue, (0, start, _TreeOrder(None, parents)))  # Priority queue for A* search
         g_costs = {start: 0}  # Cost from start to current node
+        created, expanded, fringe = self._hooks()
         self.numCreated += 1
+        self.maxFringe = 1
+        if created:
+            created(start)
 
         while queue:
-            self.maxFringe = max(self.maxFringe, len(queue))
-            f_cost, current, path = heapq.heappop(queue)
-            if current in visited:
+            f_cost, current, parent = heapq.heappop(queue)
+            if current in parents:
                 continue
-            visited.add(current)
+            parents[current] = parent.cell
             self.numExpanded += 1
-            path = path + [current]
+            if expanded:
+                expanded(current)
             if current == goal:
-                self.depth = len(path) - 1
-                return path
-            for neighbor in self.get_neighbors(current):
+                return self.reconstruct_path(parents, goal)
+            parent = _TreeOrder(current, parents)
+            i = (current[0] - 1) * cols + current[1] - 1
+            for neighbor in targets[offsets[i]:offsets[i + 1]]:
                 tentative_g_cost = g_costs[current] + 1
                 if neighbor not in g_costs or tentative_g_cost < g_costs[neighbor]:
                     g_costs[neighbor] = tentative_g_cost
                     f_cost = tentative_g_cost + heuristic(neighbor, goal)
-                    heapq.heappush(queue, (f_cost, neighbor, path))
+                    heapq.heappush(queue, (f_cost, neighbor, parent))
+                    self.numCreated += 1
+                    if created:
+                        created(neighbor)
+            size = len(queue)
+            if size > self.maxFringe:
+                self.maxFringe = size
+            if fringe:
+                fringe(size)
+        return None
+
+    def ida_star(self, start, goal, node_limit=None):
+        # Iterative deepening A*: depth-first searches bounded by f = g + h,
+        # raising the bound until the goal is reached. The raise doubles every
+        # iteration, so long detours (perfect mazes) take a few iterations
+        # instead of one per two steps; the iteration that reaches the goal
+        # keeps searching below the best path found, so the path is still the
+        # shortest. Memory is the current path plus a table of the lowest g
+        # each cell was reached with in this iteration, which stops growing at
+        # node_limit cells (cells past it are only checked against the path).
+        # With a node_limit below the number of reachable cells, cells are
+        # revisited along different paths, which grows quickly on mazes with
+        # loops (most of all when there is no path). numExpanded counts
+        # expansions over all iterations, maxFringe is the longest path held.
+        self.reset_metrics()
+        limit = self.NODE_LIMIT if node_limit is None else node_limit
+        start, goal = tuple(start), tuple(goal)
+
+        # Define a heuristic function (Manhattan distance)
+        def heuristic(a, b):
+            return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+        offsets, targets = self.neighbor_index()
+        cols = self.cols
+        created, expanded, fringe = self._hooks()
+        bound = heuristic(start, goal)
+        step = 2  # Next raise of the bound
+        self.numCreated += 1
+        self.maxFringe = 1
+        if created:
+            created(start)
+
+        while True:
+            path = [start]
+            on_path = {start}
+            best_g = {start: 0}  # Transposition table of this iteration
+            i = (start[0] - 1) * cols + start[1] - 1
+            stack = [iter(targets[offsets[i]:offsets[i + 1]])]  # Neighbors left to try at each path cell
+            self.numExpanded += 1
+            if expanded:
+                expanded(start)
+            if start == goal:
+                return self.reconstruct_path({start: None}, start)
+            next_bound = float('inf')
+            found = None
+
+            while stack:
+                neighbor = next(stack[-1], None)
+                if neighbor is None:  # Every neighbor tried: backtrack
+                    stack.pop()
+                    on_path.discard(path.pop())
+                    continue
+                g_cost = len(path)
+                self.numCreated += 1
+                if created:
+                    created(neighbor)
+                if neighbor in on_path:
+                    continue
+                known = best_g.get(neighbor)
+                if known is not None and known <= g_cost:
+                    continue
+                f_cost = g_cost + heuristic(neighbor, goal)
+                if f_cost > bound:
+                    next_bound = min(next_bound, f_cost)
+                    continue
+                if known is not None or len(best_g) < limit:
+                    best_g[neighbor] = g_cost
+                self.numExpanded += 1
+                if expanded:
+                    expanded(neighbor)
+                if neighbor == goal:
+                    found = path + [neighbor]
+                    bound = g_cost - 1  # Only a shorter path can replace it
+                    continue
+                path.append(neighbor)
+                on_path.add(neighbor)
+                i = (neighbor[0] - 1) * cols + neighbor[1] - 1
+                stack.append(iter(targets[offsets[i]:offsets[i + 1]]))
+                if len(path) > self.maxFringe:
+                    self.maxFringe = len(path)
+                if fringe:
+                    fringe(len(path))
+
+            if found is not None:
+                self.depth = len(found) - 1
+                return found
+            if next_bound >= self.rows * self.cols:
+                return None  # No path without a repeated cell is that long
+            bound = max(next_bound, bound + step)
+            step *= 2
+
+    def sma_star(self, start, goal, node_limit=None):
+        # Simplified memory-bounded A* (SMA*): A* over a search tree of at most
+        # node_limit nodes. Successors are generated one at a time; when memory
+        # is full the shallowest highest-f leaf is forgotten and its f kept in
+        # its parent, which regenerates it only if that f becomes the lowest.
+        # A node that already holds a cell with a lower or equal g prunes new
+        # copies of it. The path is optimal when the shortest path fits in
+        # node_limit nodes, otherwise None is returned. Like ida_star it
+        # revisits cells when memory runs short, so on mazes with loops a
+        # node_limit too small for the path (or a maze without one) can take
+        # exponential time to give up. Otherwise each generated node costs
+        # O(log node_limit) (nothing is backed up past a node's parent), so on
+        # perfect mazes it runs about three to four times slower than astar.
+        # numExpanded counts nodes whose successors were generated (again after
+        # being forgotten), maxFringe the most nodes held in memory.
+        self.reset_metrics()
+        limit = self.NODE_LIMIT if node_limit is None else node_limit
+        if limit < 2:
+            raise ValueError("sma_star needs a node_limit of at least 2")
+        start, goal = tuple(start), tuple(goal)
+
+        # Define a heuristic function (Manhattan distance)
+        def heuristic(a, b):
+            return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+        offsets, targets = self.neighbor_index()
+        cols = self.cols
+        created, expanded, fringe = self._hooks()
+        inf = float('inf')
+        order = itertools.count()
+        root = _SMANode(start, 0, heuristic(start, goal), 0, None)
+        live = {root}  # Nodes in memory
+        best = {start: root}  # Lowest-g node in memory of each cell
+        opened = []  # (f, -depth, order, node): deepest lowest-f node that can still generate first
+        leaves = []  # (-f, depth, order, node): shallowest highest-f leaf first
+        self.numCreated += 1
+        self.maxFringe = 1
+        if created:
+            created(start)
+        if start == goal:
+            self.numExpanded += 1
+            if expanded:
+                expanded(start)
+            return self.reconstruct_path({start: None}, start)
+
+        def key(node):
+            # f under which the node waits in opened: its own until it is
+            # expanded, then that of its best successor not in memory
+            return node.f if node.pending is None else min(node.pending)[0]
+
+        def push(node):
+            # Queue the node under its current key (older entries become stale)
+            if node.pending is None or node.pending:
+                heapq.heappush(opened, (key(node), -node.depth, next(order), node))
+            if not node.children and node.parent is not None:
+                heapq.heappush(leaves, (-node.f, node.depth, next(order), node))
+
+        def backup(node):
+            # Raise the f of a node left without children to the lowest f of
+            # the successors it has forgotten or not generated yet. Only leaves
+            # are forgotten, and their f is all the parent keeps of them, so
+            # the f of a node with children is never read and nothing has to
+            # be carried up to the ancestors.
+            if not node.children:
+                f_cost = min(node.pending)[0] if node.pending else inf
+                if f_cost > node.f:
+                    node.f = f_cost
+
+        def forget(keep):
+            # Drop the shallowest highest-f leaf other than keep, False if there is none
+            skipped = []
+            while leaves:
+                entry = heapq.heappop(leaves)
+                node = entry[3]
+                if not node.alive or node.children or -entry[0] != node.f:
+                    continue
+                if node is keep:
+                    skipped.append(entry)
+                    continue
+                parent = node.parent
+                parent.children.remove(node)
+                if node.f < inf:
+                    parent.pending.append((node.f, node.cell))
+                node.alive = False
+                live.discard(node)
+                if best.get(node.cell) is node:
+                    del best[node.cell]
+                backup(parent)
+                push(parent)
+                break
+            else:
+                return False
+            for entry in skipped:
+                heapq.heappush(leaves, entry)
+            return True
+
+        push(root)
+        while opened:
+            f_cost, _, _, node = heapq.heappop(opened)
+            if not node.alive or not (node.pending is None or node.pending) or f_cost != key(node):
+                continue  # Stale entry
+            if f_cost >= limit:
+                return None  # Every path left needs more than node_limit nodes
+            if node.cell == goal:
+                path = []
+                while node is not None:
+                    path.append(node.cell)
+                    node = node.parent
+                path.reverse()
+                self.depth = len(path) - 1
+                return path
+
+            if node.pending is None:
+                self.numExpanded += 1
+                if expanded:
+                    expanded(node.cell)
+                i = (node.cell[0] - 1) * cols + node.cell[1] - 1
+                node.pending = [(max(node.f, node.g + 1 + heuristic(neighbor, goal)), neighbor)
+                                for neighbor in targets[offsets[i]:offsets[i + 1]]]
+            if node.pending:  # Generate the best successor not in memory
+                entry = min(node.pending)
+                node.pending.remove(entry)
+                g_cost = node.g + 1
+                other = best.get(entry[1])
+                if (other is None or g_cost < other.g) and (len(live) < limit or forget(node)):
+                    child = _SMANode(entry[1], g_cost, entry[0], node.depth + 1, node)
+                    if child.depth >= limit - 1 and child.cell != goal:
+                        child.f = inf  # Its successors could never be held in memory
+                    elif child.f >= self.rows * self.cols:
+                        child.f = inf  # No path without a repeated cell is that long
+                    node.children.append(child)
+                    live.add(child)
+                    best[child.cell] = child
+                    self.numCreated += 1
+                    if created:
+                        created(child.cell)
+                    if len(live) > self.maxFringe:
+                        self.maxFringe = len(live)
+                    if fringe:
+                        fringe(len(live))
+                    push(child)
+            backup(node)
+            push(node)
+            if len(opened) + len(leaves) > 4 * limit + 64:  # Drop the stale heap entries
+                opened.clear()
+                leaves.clear()
+                for node in live:
+                    push(node)
+        return None
+
+    def bidirectional_bfs(self, start, goal):
+        # Bidirectional BFS: grow one BFS layer at a time from whichever end has
+        # the smaller frontier, until the two searches meet
+        self.reset_metrics()
+        offsets, targets = self.neighbor_index()
+        cols = self.cols
+        parents = ({start: None}, {goal: None})  # Forward and backward parent links
+        frontiers = ([start], [goal])
+        created, expanded, fringe = self._hooks()
+        self.numCreated += 1 if start == goal else 2
+        if created:
+            created(start)
+        if start == goal:
+            self.numExpanded += 1
+            self.maxFringe = 1
+            if expanded:
+                expanded(start)
+            return self.join_paths(parents, start)
+        if created:
+            created(goal)
+
+        while frontiers[0] and frontiers[1]:
+            size = len(frontiers[0]) + len(frontiers[1])
+            if size > self.maxFringe:
+                self.maxFringe = size
+            if fringe:
+                fringe(size)
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            own, other = parents[side], parents[1 - side]
+            layer = []
+            meet = None
+            for current in frontiers[side]:
+                self.numExpanded += 1
+                if expanded:
+                    expanded(current)
+                i = (current[0] - 1) * cols + current[1] - 1
+                for neighbor in targets[offsets[i]:offsets[i + 1]]:
+                    if neighbor not in own:
+                        own[neighbor] = current
+                        layer.append(neighbor)
+                        self.numCreated += 1
+                        if created:
+                            created(neighbor)
+                        # Every meeting cell in this layer gives the same length, keep the first
+                        if meet is None and neighbor in other:
+                            meet = neighbor
+            if meet is not None:
+                return self.join_paths(parents, meet)
+            frontiers = (layer, frontiers[1]) if side == 0 else (frontiers[0], layer)
+        return None
+
+    def bidirectional_astar(self, start, goal):
+        # Bidirectional A*: forward search towards the goal and backward search
+        # towards the start, alternating on the smaller open list. It stops once
+        # the lowest f-cost on either side cannot beat the best meeting found.
+        self.reset_metrics()
+
+        # Define a heuristic function (Manhattan distance)
+        def heuristic(a, b):
+            return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+        offsets, targets = self.neighbor_index()
+        cols = self.cols
+        ends = (goal, start)  # Target of the forward and of the backward search
+        queues = ([(heuristic(start, goal), start)], [(heuristic(goal, start), goal)])
+        g_costs = ({start: 0}, {goal: 0})
+        parents = ({start: None}, {goal: None})
+        closed = (set(), set())
+        created, expanded, fringe = self._hooks()
+        if start == goal:  # A single node, reported like the one-sided searches
+            self.numCreated += 1
+            self.numExpanded += 1
+            self.maxFringe = 1
+            if created:
+                created(start)
+            if expanded:
+                expanded(start)
+            return self.join_paths(parents, start)
+        self.numCreated += 2
+        self.maxFringe = 2
+        if created:
+            created(start)
+            created(goal)
+        best, meet = float('inf'), None
+
+        while queues[0] and queues[1]:
+            for side in (0, 1):  # Drop entries of nodes already expanded on that side
+                while queues[side] and queues[side][0][1] in closed[side]:
+                    heapq.heappop(queues[side])
+            if not queues[0] or not queues[1]:
+                break
+            if max(queues[0][0][0], queues[1][0][0]) >= best:
+                break
+            side = 0 if len(queues[0]) <= len(queues[1]) else 1
+            f_cost, current = heapq.heappop(queues[side])
+            closed[side].add(current)
+            self.numExpanded += 1
+            if expanded:
+                expanded(current)
+            own_g, other_g = g_costs[side], g_costs[1 - side]
+            i = (current[0] - 1) * cols + current[1] - 1
+            for neighbor in targets[offsets[i]:offsets[i + 1]]:
+                tentative_g_cost = own_g[current] + 1
+                if neighbor not in own_g or tentative_g_cost < own_g[neighbor]:
+                    own_g[neighbor] = tentative_g_cost
+                    parents[side][neighbor] = current
+                    heapq.heappush(queues[side], (tentative_g_cost + heuristic(neighbor, ends[side]), neighbor))
+                    self.numCreated += 1
+                    if created:
+                        created(neighbor)
+                    if neighbor in other_g and tentative_g_cost + other_g[neighbor] < best:
+                        best, meet = tentative_g_cost + other_g[neighbor], neighbor
+            size = len(queues[0]) + len(queues[1])
+            if size > self.maxFringe:
+                self.maxFringe = size
+            if fringe:
+                fringe(size)
+
+        if meet is None:
+            return None
+        return self.join_paths(parents, meet)
+
+    def wavefront_bfs(self, start, goal):
+        # BFS that expands a whole layer per step. Cells are bits of Python
+        # integers (bit (row - 1) * cols + (col - 1)) and the next layer is
+        # computed with a few whole-grid AND/OR/shift operations, so there is
+        # no per-node Python work. Walls are read from the east/south side of
+        # each cell pair, as pyamaze keeps both sides of a wall in sync.
+        # numExpanded/numCreated count whole layers, as all of them are expanded,
+        # and an observer only hears about layer sizes (there are no per-cell steps).
+        # Each step costs O(cells / word size), so it pays off on braided/open
+        # mazes (depth close to the Manhattan distance) and loses to bfs on
+        # perfect mazes whose paths are thousands of steps long.
+        self.reset_metrics()
+        rows, cols = self.rows, self.cols
+        n = rows * cols
+        fringe = self._hooks()[2]
+        packed = self.maze.packWalls()
+
+        def mask(bit, cleared):
+            # Integer with bit i set when packed[i] has the wall bit open,
+            # built as a '0'/'1' string so it stays C speed
+            table = bytes(b'1'[0] if b & bit else b'0'[0] for b in range(256))
+            digits = bytearray(packed.translate(table))
+            cleared(digits)
+            digits.reverse()
+            return int(digits, 2) if n else 0
+
+        def clear_last_col(digits):
+            digits[cols - 1::cols] = b'0' * rows
+
+        def clear_last_row(digits):
+            digits[(rows - 1) * cols:] = b'0' * cols
+
+        horizontal = mask(1, clear_last_col)  # Bit i: cell i <-> cell i + 1 is open
+        vertical = mask(8, clear_last_row)  # Bit i: cell i <-> cell i + cols is open
+
+        start_id = (start[0] - 1) * cols + start[1] - 1
+        goal_id = (goal[0] - 1) * cols + goal[1] - 1
+        goal_bit = 1 << goal_id
+        frontier = 1 << start_id
+        unvisited = ((1 << n) - 1) ^ frontier
+        layers = [frontier, 0, 0]  # Visited cells by distance modulo 3, enough to walk back
+        self.numCreated += 1
+        depth = 0
+
+        while frontier:
+            size = frontier.bit_count()
+            self.maxFringe = max(self.maxFringe, size)
+            if fringe:
+                fringe(size)
+            if frontier & goal_bit:
+                self.numExpanded += 1
+                with self._phase('path'):
+                    return self._wavefront_path(packed, layers, goal_id, depth)
+            self.numExpanded += size
+            frontier = (((frontier & horizontal) << 1) | ((frontier >> 1) & horizontal)
+                        | ((frontier & vertical) << cols) | ((frontier >> cols) & vertical)) & unvisited
+            unvisited ^= frontier
+            depth += 1
+            layers[depth % 3] |= frontier
+            self.numCreated += frontier.bit_count()
+        return None
+
+    def _wavefront_path(self, packed, layers, goal_id, depth):
+        # Walk back from the goal: the neighbor one layer closer is the only
+        # visited neighbor in class (distance - 1) % 3
+        rows, cols = self.rows, self.cols
+        n = rows * cols
+        classes = [format(layer, 'b').zfill(n)[::-1] for layer in layers]
+        path = []
+        i = goal_id
+        for d in range(depth, 0, -1):
+            path.append((i // cols + 1, i % cols + 1))
+            previous = classes[(d - 1) % 3]
+            b = packed[i]
+            row, col = divmod(i, cols)
+            if row > 0 and b & 4 and previous[i - cols] == '1':
+                i -= cols
+            elif row < rows - 1 and b & 8 and previous[i + cols] == '1':
+                i += cols
+            elif col > 0 and b & 2 and previous[i - 1] == '1':
+                i -= 1
+            else:
+                i += 1
+        path.append((i // cols + 1, i % cols + 1))
+        path.reverse()
+        self.depth = depth
+        return path
+
+    def corridor_graph(self):
+        # The CorridorGraph of the maze, built once and rebuilt when maze_map changes
+        maze_map = self.maze.maze_map
+        version = _version(maze_map)
+        size = (self.rows, self.cols)
+        cached = _CORRIDOR_GRAPHS.get(self.maze)
+        if cached is not None and cached[0] is maze_map and cached[1] == version and cached[2] == size:
+            return cached[3]
+        if hasattr(maze_map, 'cellBits'):
+            raise ValueError("A corridor graph needs the whole maze in memory, it cannot be built for a tiled maze")
+        offsets, targets = self.neighbor_index(whole=True)
+        with self._phase('corridor_graph'):
+            graph = CorridorGraph(offsets, targets, self.cols)
+        _CORRIDOR_GRAPHS[self.maze] = (maze_map, version, size, graph)
+        return graph
+
+    def corridor_dijkstra(self, start, goal):
+        # Dijkstra on the corridor graph, expanded back to the full cell path
+        return self.corridor_search(start, goal, lambda cell: 0)
+
+    def corridor_astar(self, start, goal):
+        # A* on the corridor graph (Manhattan distance stays admissible since
+        # a corridor is never shorter than the distance between its ends)
+        return self.corridor_search(start, goal, lambda cell: abs(cell[0] - goal[0]) + abs(cell[1] - goal[1]))
+
+    def corridor_search(self, start, goal, heuristic):
+        # Weighted search over the corridor graph with start and goal spliced
+        # in as temporary nodes. The metrics count graph nodes, depth is the
+        # length of the expanded cell path.
+        self.reset_metrics()
+        start, goal = tuple(start), tuple(goal)
+        graph = self.corridor_graph()
+        extra = {}  # Edges to and from the query endpoints
+        spliced_start = start not in graph.edges
+        if spliced_start:
+            extra[start] = []
+            for first in graph.neighbors(start):
+                end, weight, _ = graph.walk(start, first, stops=(goal,))
+                extra[start].append((end, weight, first))
+        if goal not in graph.edges:
+            for first in graph.neighbors(goal):
+                end, weight, last = graph.walk(goal, first, stops=(start,))
+                if end == start and spliced_start:
+                    continue  # Already found walking from the start
+                extra.setdefault(end, []).append((goal, weight, last))
+
+        queue = [(heuristic(start), 0, start)]
+        g_costs = {start: 0}
+        parents = {start: None}  # node --> (previous node, first cell of the corridor)
+        closed = set()
+        created, expanded, fringe = self._hooks()
+        self.numCreated += 1
+        self.maxFringe = 1
+        if created:
+            created(start)
+
+        while queue:
+            f_cost, g_cost, current = heapq.heappop(queue)
+            if current in closed:
+                continue
+            closed.add(current)
+            self.numExpanded += 1
+            if expanded:
+                expanded(current)
+            if current == goal:
+                with self._phase('path'):
+                    path = [goal]
+                    while parents[path[-1]] is not None:
+                        previous, first = parents[path[-1]]
+                        path.extend(reversed([previous] + graph.expand(previous, first, path[-1])[:-1]))
+                    path.reverse()
+                self.depth = len(path) - 1
+                return path
+            for neighbor, weight, first in graph.edges.get(current, []) + extra.get(current, []):
+                tentative_g_cost = g_cost + weight
+                if neighbor not in g_costs or tentative_g_cost < g_costs[neighbor]:
+                    g_costs[neighbor] = tentative_g_cost
+                    parents[neighbor] = (current, first)
+                    heapq.heappush(queue, (tentative_g_cost + heuristic(neighbor), tentative_g_cost, neighbor))
                     self.numCreated += 1
+                    if created:
+                        created(neighbor)
+            size = len(queue)
+            if size > self.maxFringe:
+                self.maxFringe = size
+            if fringe:
+                fringe(size)
         return None
 
+    def distance_field(self, goal):
+        # One reverse BFS from the goal answering every start of a "many starts,
+        # one goal" workload. The last few fields of each maze are cached and
+        # dropped as soon as maze_map changes.
+        goal = tuple(goal)
+        maze_map = self.maze.maze_map
+        version = _version(maze_map)
+        size = (self.rows, self.cols)
+        cached = _DISTANCE_FIELDS.get(self.maze)
+        if cached is None or cached[0] is not maze_map or cached[1] != version or cached[2] != size:
+            cached = (maze_map, version, size, OrderedDict())
+            _DISTANCE_FIELDS[self.maze] = cached
+        fields = cached[3]
+        if goal in fields:
+            fields.move_to_end(goal)
+            return fields[goal]
+
+        offsets, targets = self.neighbor_index()
+        rows, cols = size
+        distances = array('i', [-1]) * (rows * cols)
+        next_hops = array('i', [-1]) * (rows * cols)
+        goal_id = (goal[0] - 1) * cols + goal[1] - 1
+        distances[goal_id] = 0
+        queue = deque([goal_id])
+        with self._phase('distance_field'):
+            while queue:
+                current = queue.popleft()
+                for neighbor in targets[offsets[current]:offsets[current + 1]]:
+                    i = (neighbor[0] - 1) * cols + neighbor[1] - 1
+                    if distances[i] < 0:
+                        distances[i] = distances[current] + 1
+                        next_hops[i] = current
+                        queue.append(i)
+
+        field = DistanceField(goal, rows, cols, distances, next_hops)
+        fields[goal] = field
+        while len(fields) > self.DISTANCE_FIELD_CACHE_SIZE:
+            fields.popitem(last=False)
+        return field
+
+    def join_paths(self, parents, meet):
+        # Join the forward path start..meet and the backward path meet..goal
+        forward, backward = parents
+        path = self.reconstruct_path(forward, meet)
+        with self._phase('path'):
+            cell = backward[meet]
+            while cell is not None:
+                path.append(cell)
+                cell = backward[cell]
+        self.depth = len(path) - 1
+        return path
+
+    def reconstruct_path(self, parents, goal):
+        # Walk the parent links back from the goal once and record the depth
+        path = []
+        cell = goal
+        with self._phase('path'):
+            while cell is not None:
+                path.append(cell)
+                cell = parents[cell]
+            path.reverse()
+        self.depth = len(path) - 1
+        return path
+
+    def neighbor_index(self, whole=False):
+        # (offsets, targets) of the maze over integer cell ids
+        # (row - 1) * cols + (col - 1): the neighbors of cell id are
+        # targets[offsets[id]:offsets[id + 1]], in N, S, W, E order.
+        # Compact and tiled mazes get a lazy index reading the wall bytes of a
+        # cell when it is expanded, so nothing is built or kept and wall edits
+        # cost nothing. A dictionary maze is read lazily too until the
+        # searches of its current walls have read as many cells as the maze
+        # has; only then is a CSR index of tuples built (expanding from it is
+        # about twice as fast as reading the dictionaries), and it is kept
+        # until maze_map is replaced or its version changes. whole=True is for
+        # callers reading every cell anyway (the corridor graph): they get the
+        # CSR index at once, and a compact maze's is dropped after use.
+        maze_map = self.maze.maze_map
+        rows, cols = self.rows, self.cols
+        slots = range(0, 4 * (rows * cols + 1), 4)
+        bits = getattr(maze_map, 'bits', None)  # Packed walls of a compact maze
+        if bits is not None and not whole:
+            return slots, _LazyNeighbors(bits.__getitem__, rows, cols)
+        cell_bits = getattr(maze_map, 'cellBits', None)  # Tiled out-of-core walls
+        if cell_bits is not None:
+            return slots, _LazyNeighbors(cell_bits, rows, cols)
+
+        version = _version(maze_map)
+        size = (rows, cols)
+        if bits is None:
+            cached = _NEIGHBOR_INDEX.get(self.maze)
+            if cached is None or cached[0] is not maze_map or cached[1] != version or cached[2] != size:
+                cached = (maze_map, version, size, None, _DictNeighbors(maze_map, rows, cols))
+                _NEIGHBOR_INDEX[self.maze] = cached
+            if cached[3] is not None:
+                return cached[3], cached[4]
+            if cached[4].reads < rows * cols and not whole:
+                return slots, cached[4]
+
+        with self._phase('neighbor_index'):
+            cells = [(row, col) for row in range(1, rows + 1) for col in range(1, cols + 1)]
+            offsets = array('l', [0])
+            targets = []
+            for i, (row, col) in enumerate(cells):
+                if bits is not None:
+                    b = bits[i]
+                    north, south, west, east = b & 4, b & 8, b & 2, b & 1
+                else:
+                    walls = maze_map[row, col]
+                    north, south, west, east = walls['N'], walls['S'], walls['W'], walls['E']
+                if row > 1 and north:
+                    targets.append(cells[i - cols])
+                if row < rows and south:
+                    targets.append(cells[i + cols])
+                if col > 1 and west:
+                    targets.append(cells[i - 1])
+                if col < cols and east:
+                    targets.append(cells[i + 1])
+                offsets.append(len(targets))
+        if bits is None:
+            _NEIGHBOR_INDEX[self.maze] = (maze_map, version, size, offsets, targets)
+        return offsets, targets
+
     def get_neighbors(self, position):
         # Get valid neighbors of a position considering the maze's walls
-        row, col = position
-        neighbors = []
-        if row > 1 and self.maze.maze_map[row, col]['N']:
-            neighbors.append((row - 1, col))
-        if row < self.rows and self.maze.maze_map[row, col]['S']:
-            neighbors.append((row + 1, col))
-        if col > 1 and self.maze.maze_map[row, col]['W']:
-            neighbors.append((row, col - 1))
-        if col < self.cols and self.maze.maze_map[row, col]['E']:
-            neighbors.append((row, col + 1))
-        return neighbors
\ No newline at end of file
+        offsets, targets = self.neighbor_index()
+        i = (position[0] - 1) * self.cols + position[1] - 1
+        return targets[offsets[i]:offsets[i + 1]]
\ No newline at end of file
@@ -0,0 +1,110 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import time
+from MazeRunner import SEARCH_METHODS, create_maze, parse_sizes, run_search, setup_agents, warm_caches
+from ResultsStore import ResultsStore
+
+# Parse a "0-99" range or "1,5,7" list of maze seeds
+def parse_seeds(text):
+    seeds = []
+    for part in text.split(','):
+        if '-' in part:
+            first, last = part.split('-')
+            seeds.extend(range(int(first), int(last) + 1))
+        else:
+            seeds.append(int(part))
+    return seeds
+
+# Read the (size, seed, method) keys already written to an interrupted sweep
+def completed_jobs(output):
+    done = set()
+    if not os.path.exists(output):
+        return done
+    with open(output, "r") as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Line cut short when the sweep was interrupted
+            done.add((record['size'], record['seed'], record['method']))
+    return done
+
+# Group the remaining jobs so that each maze is generated once for all its methods
+def plan_tasks(sizes, seeds, methods, done):
+    tasks = []
+    for rows, cols in sizes:
+        for seed in seeds:
+            todo = [search_method for search_method in methods if (f"{rows}x{cols}", seed, search_method) not in done]
+            if todo:
+                tasks.append((rows, cols, seed, todo))
+    return tasks
+
+# Worker: generate the seeded maze and start/goal pair, then run every method on it
+def run_task(task):
+    rows, cols, seed = task[:3]
+    random.seed(seed)
+    m = create_maze(rows, cols, headless=True)
+    _, _, start_pos, goal_pos = setup_agents(m, rows, cols)
+    warm_caches(m, task[3])
+
+    records = []
+    for search_method in task[3]:
+        started = time.perf_counter()
+        path, depth, num_created, num_expanded, max_fringe = run_search(m, search_method, start_pos, goal_pos)
+        records.append({
+            'size': f"{rows}x{cols}",
+            'seed': seed,
+            'method': search_method,
+            'start': start_pos,
+            'goal': goal_pos,
+            'time': time.perf_counter() - started,
+            'depth': depth,
+            'numCreated': num_created,
+            'numExpanded': num_expanded,
+            'maxFringe': max_fringe,
+        })
+    return records
+
+# Spread the tasks over a process pool and append results to the JSONL output
+# (and to a results store, when given) as they finish
+def sweep(sizes, seeds, methods, output, workers=None, store=None):
+    tasks = plan_tasks(sizes, seeds, methods, completed_jobs(output))
+    written = 0
+    with multiprocessing.Pool(workers) as pool, open(output, "a+") as file:
+        if file.tell() > 0:
+            file.seek(file.tell() - 1)
+            if file.read(1) != "\n":
+                file.write("\n")  # Terminate a line cut short by an interruption
+        for records in pool.imap_unordered(run_task, tasks):
+            for record in records:
+                file.write(json.dumps(record) + "\n")
+            file.flush()
+            if store is not None:
+                store.record_many(records)
+            written += len(records)
+    return written
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a (size, seed, method) sweep on all cores")
+    parser.add_argument("--sizes", type=str, required=True, help="Comma separated ROWSxCOLS maze sizes")
+    parser.add_argument("--seeds", type=str, required=True, help="Maze seeds, e.g. 0-99 or 1,5,7")
+    parser.add_argument("--methods", type=str, default=','.join(SEARCH_METHODS), help="Comma separated search methods")
+    parser.add_argument("--output", type=str, default="sweep.jsonl", help="JSONL results file, appended to and used to resume")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: all cores)")
+    parser.add_argument("--store", type=str, default=None, help="Also record the results in this results database")
+
+    args = parser.parse_args()
+
+    methods = args.methods.split(',')
+    for search_method in methods:
+        if search_method not in SEARCH_METHODS:
+            parser.error(f"Unknown search method: {search_method}")
+
+    store = ResultsStore(args.store) if args.store else None
+    written = sweep(parse_sizes(args.sizes), parse_seeds(args.seeds), methods, args.output, args.workers, store)
+    if store is not None:
+        store.close()
+    print(f"Written {written} results to {args.output}")
@@ -21,10 +21,10 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-import random,datetime,csv,os
-from tkinter import *
+import random,datetime,csv,os,hashlib,mmap,struct,types,operator,gc,contextlib
 from enum import Enum
-from collections import deque
+from collections import deque,OrderedDict
+from collections.abc import Mapping,Sequence
 
 class COLOR(Enum):
     '''
@@ -45,6 +45,592 @@ class COLOR(Enum):
     blue=('DeepSkyBlue4','DeepSkyBlue2')
     yellow=('yellow2','yellow2')
 
+_tk=None
+
+def _tkinter():
+    '''
+    The tkinter module, imported the first time something is drawn.
+    Generating, loading and solving mazes (headless) never imports it,
+    so they start faster and work where Tk is not installed.
+    '''
+    global _tk
+    if _tk is None:
+        try:
+            import tkinter
+        except ImportError as e:
+            raise ImportError('tkinter is needed to draw mazes, use maze(headless=True) without it') from e
+        _tk=tkinter
+    return _tk
+
+def __getattr__(name):
+    '''
+    pyamaze used to run 'from tkinter import *', so the names it exported
+    (tkinter.__all__: Tk, Canvas, Label, YES, ...) are still looked up there,
+    importing tkinter on first use. Any other name, or any name when Tk is
+    not installed, is an AttributeError so hasattr/getattr work as usual.
+    '''
+    error=AttributeError(f"module 'pyamaze' has no attribute '{name}'")
+    if name.startswith('_'):
+        raise error
+    try:
+        tk=_tkinter()
+    except ImportError as e:
+        raise error from e
+    if name not in getattr(tk,'__all__',()):
+        raise error
+    return getattr(tk,name)
+
+_WALL_BITS={'E':1,'W':2,'N':4,'S':8}
+# Cell offset of a move of a string path
+_MOVES={'E':(0,1),'W':(0,-1),'N':(-1,0),'S':(1,0)}
+
+class cellDict(dict):
+    '''
+    The {'E':..,'W':..,'N':..,'S':..} dictionary of one cell of a wallDict.
+    Every change (item assignment or deletion, update, pop, ...) counts as a
+    change of the owning wallDict. _owner is set by the wallDict storing it
+    (the dict constructor is kept, it is called for every cell of a maze);
+    changes made before it is stored count for nothing.
+    '''
+    __slots__=('_owner',)
+    def _changed(self):
+        try:
+            owner=self._owner
+        except AttributeError:
+            return
+        owner._changed()
+    def __setitem__(self,d,v):
+        super().__setitem__(d,v)
+        self._changed()
+    def __delitem__(self,d):
+        super().__delitem__(d)
+        self._changed()
+    def update(self,*args,**kwargs):
+        super().update(*args,**kwargs)
+        self._changed()
+    def __ior__(self,other):
+        self.update(other)
+        return self
+    def setdefault(self,d,default=None):
+        if d not in self:
+            self[d]=default
+        return self[d]
+    def pop(self,*args):
+        v=super().pop(*args)
+        self._changed()
+        return v
+    def popitem(self):
+        item=super().popitem()
+        self._changed()
+        return item
+    def clear(self):
+        super().clear()
+        self._changed()
+    def __reduce__(self):
+        return (dict,(dict(self),))
+
+@contextlib.contextmanager
+def _gcPaused():
+    '''
+    Pause the cyclic garbage collector while one cellDict per cell is created.
+    They only hold ints, but unlike plain dicts they stay tracked, and every
+    collection would scan the whole growing maze_map again.
+    '''
+    enabled=gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+class wallDict(dict):
+    '''
+    The regular maze_map dictionary (cell --> cellDict).
+    version is increased on every change of the map or of one of its cells,
+    so cached results about the maze (e.g. a neighbour index) can tell that
+    the walls have changed.
+    Values are stored as given, never copied: a cellDict not stored anywhere
+    else is adopted, but once the map holds any other value (a plain dict, a
+    cell of another map) its changes cannot be seen any more and version
+    becomes None for good, so nothing about the maze is cached.
+    '''
+    def __init__(self,*args,**kwargs):
+        '''
+        Builds a new map from a cell --> walls mapping, copying the walls of
+        each cell into a cellDict of its own.
+        '''
+        super().__init__()
+        self.version=0
+        for cell,walls in dict(*args,**kwargs).items():
+            walls=cellDict(walls)
+            walls._owner=self
+            super().__setitem__(cell,walls)
+    def _changed(self):
+        if self.version is not None:
+            self.version+=1
+    def __setitem__(self,cell,walls):
+        if isinstance(walls,cellDict) and getattr(walls,'_owner',self) is self:
+            walls._owner=self
+        else:
+            self.version=None
+        super().__setitem__(cell,walls)
+        self._changed()
+    def __delitem__(self,cell):
+        super().__delitem__(cell)
+        self._changed()
+    def update(self,*args,**kwargs):
+        for cell,walls in dict(*args,**kwargs).items():
+            self[cell]=walls
+        self._changed()
+    def __ior__(self,other):
+        self.update(other)
+        return self
+    def setdefault(self,cell,default=None):
+        if cell not in self:
+            self[cell]=default
+        return self[cell]
+    def pop(self,*args):
+        walls=super().pop(*args)
+        self._changed()
+        return walls
+    def popitem(self):
+        item=super().popitem()
+        self._changed()
+        return item
+    def clear(self):
+        super().clear()
+        self._changed()
+    def __reduce__(self):
+        return (wallDict,(dict(self),))
+
+class cellWalls(Mapping):
+    '''
+    A live view of the four walls of one cell of a wallMap.
+    It behaves like the {'E':..,'W':..,'N':..,'S':..} dictionary of the
+    regular maze_map, so maze_map[cell]['N'] reads and writes still work.
+    '''
+    __slots__=('_map','_i')
+    def __init__(self,wmap,i):
+        self._map=wmap
+        self._i=i
+    def __getitem__(self,d):
+        return 1 if self._map.bits[self._i]&_WALL_BITS[d] else 0
+    def __setitem__(self,d,v):
+        if v:
+            self._map.bits[self._i]|=_WALL_BITS[d]
+        else:
+            self._map.bits[self._i]&=~_WALL_BITS[d]&0xFF
+        self._map.version+=1
+    def __iter__(self):
+        return iter(_WALL_BITS)
+    def __len__(self):
+        return 4
+    def __repr__(self):
+        return repr(dict(self))
+
+class wallMap(Mapping):
+    '''
+    Compact replacement of the maze_map dictionary.
+    Each cell takes one byte of a contiguous bytearray (row major) with one
+    bit per open direction (E=1, W=2, N=4, S=8), instead of a tuple key plus
+    a four entry dictionary.
+    Keys are iterated in the same column major order as the regular maze_map
+    so saved CSV files are identical.
+    version counts the changes made through item assignment, like wallDict.
+    '''
+    def __init__(self,rows,cols,bits=None):
+        '''
+        rows,cols-->    Size of the maze
+        bits-->     Optional existing buffer of rows*cols bytes to wrap
+                    (bytearray, memoryview, mmap). A new zeroed one
+                    (all walls closed) is created by default.
+        '''
+        self.rows=rows
+        self.cols=cols
+        self.bits=bytearray(rows*cols) if bits is None else bits
+        self.version=0
+    def index(self,cell):
+        '''
+        Position of the cell in bits. KeyError if the cell is not in the maze.
+        '''
+        try:
+            x,y=cell
+        except (TypeError,ValueError):
+            raise KeyError(cell) from None
+        if 1<=x<=self.rows and 1<=y<=self.cols:
+            return (x-1)*self.cols+y-1
+        raise KeyError(cell)
+    def __getitem__(self,cell):
+        return cellWalls(self,self.index(cell))
+    def __setitem__(self,cell,walls):
+        v=0
+        for d,b in _WALL_BITS.items():
+            if walls[d]:
+                v|=b
+        self.bits[self.index(cell)]=v
+        self.version+=1
+    def __contains__(self,cell):
+        try:
+            self.index(cell)
+        except KeyError:
+            return False
+        return True
+    def __iter__(self):
+        for y in range(1,self.cols+1):
+            for x in range(1,self.rows+1):
+                yield (x,y)
+    def __len__(self):
+        return self.rows*self.cols
+
+class tiledWallMap(Mapping):
+    '''
+    Read-only maze_map of a binary maze file too big to load, for searching
+    it out of core. The file is memory mapped and the walls are read in
+    square tiles of tileSize x tileSize cells. Only the last cacheTiles tiles
+    used are kept (LRU), so the memory used does not depend on the maze size.
+    hits/misses/evictions count the tile lookups, see cacheInfo().
+    maze_map[cell] is a read-only {'E':..,'W':..,'N':..,'S':..} mapping and
+    cellBits(i) the wallMap byte of the cell at row major position i.
+    '''
+    version=0 # The walls never change
+    def __init__(self,path,tileSize=256,cacheTiles=64):
+        if tileSize<1 or cacheTiles<1:
+            raise ValueError('tileSize and cacheTiles must be at least 1')
+        self.path=path
+        self.rows,self.cols,self._view=readMazeBinary(path,access=mmap.ACCESS_READ)
+        if hasattr(mmap,'MADV_RANDOM'):
+            # A tile reads a few bytes of many rows, read-ahead would be wasted
+            self._view.obj.madvise(mmap.MADV_RANDOM)
+        self.tileSize=tileSize
+        self.cacheTiles=cacheTiles
+        self._across=-(-self.cols//tileSize) # Tiles per row of tiles
+        self._tiles=OrderedDict() # tile number --> bytes, least recently used first
+        self._lastTile=None
+        self._last=None
+        self.hits=0
+        self.misses=0
+        self.evictions=0
+    def _load(self,t):
+        '''
+        Read tile number t (rows of tileSize bytes, padded at the right edge).
+        '''
+        size=self.tileSize
+        cols=self.cols
+        r0,c0=t//self._across*size,t%self._across*size
+        c1=min(c0+size,cols)
+        pad=bytes(size-(c1-c0))
+        view=self._view
+        return b''.join(view[r*cols+c0:r*cols+c1].tobytes()+pad for r in range(r0,min(r0+size,self.rows)))
+    def cellBits(self,i):
+        '''
+        Wall bits (E=1, W=2, N=4, S=8) of the cell at row major position i.
+        '''
+        size=self.tileSize
+        r,c=divmod(i,self.cols)
+        t=r//size*self._across+c//size
+        if t!=self._lastTile:
+            tiles=self._tiles
+            tile=tiles.get(t)
+            if tile is None:
+                self.misses+=1
+                tile=tiles[t]=self._load(t)
+                if len(tiles)>self.cacheTiles:
+                    tiles.popitem(last=False)
+                    self.evictions+=1
+            else:
+                self.hits+=1
+                tiles.move_to_end(t)
+            self._lastTile=t
+            self._last=tile
+        else:
+            self.hits+=1
+        return self._last[r%size*size+c%size]
+    def cacheInfo(self):
+        '''
+        Tile cache statistics as a dictionary.
+        '''
+        lookups=self.hits+self.misses
+        return {'hits':self.hits,'misses':self.misses,'evictions':self.evictions,
+                'hitRate':self.hits/lookups if lookups else None,
+                'resident':len(self._tiles),'cacheTiles':self.cacheTiles,'tileSize':self.tileSize}
+    def packed(self):
+        '''
+        All the walls as bytes (reads the whole file, bypassing the tiles).
+        '''
+        return self._view.tobytes()
+    def close(self):
+        '''
+        Drop the tiles and unmap the file.
+        '''
+        self._tiles.clear()
+        self._lastTile=self._last=None
+        mm=self._view.obj
+        self._view.release()
+        mm.close()
+    def index(self,cell):
+        '''
+        Position of the cell in the file. KeyError if the cell is not in the maze.
+        '''
+        try:
+            x,y=cell
+        except (TypeError,ValueError):
+            raise KeyError(cell) from None
+        if 1<=x<=self.rows and 1<=y<=self.cols:
+            return (x-1)*self.cols+y-1
+        raise KeyError(cell)
+    def __getitem__(self,cell):
+        b=self.cellBits(self.index(cell))
+        return types.MappingProxyType({'E':b&1 and 1,'W':b>>1&1,'N':b>>2&1,'S':b>>3&1})
+    def __contains__(self,cell):
+        try:
+            self.index(cell)
+        except KeyError:
+            return False
+        return True
+    def __iter__(self):
+        for y in range(1,self.cols+1):
+            for x in range(1,self.rows+1):
+                yield (x,y)
+    def __len__(self):
+        return self.rows*self.cols
+
+class gridCells(Sequence):
+    '''
+    The list of all cells (same column major order as maze.grid) without
+    storing them. Used as maze.grid for compact mazes.
+    '''
+    def __init__(self,rows,cols):
+        self.rows=rows
+        self.cols=cols
+    def __len__(self):
+        return self.rows*self.cols
+    def __getitem__(self,i):
+        if isinstance(i,slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i<0:
+            i+=len(self)
+        if not 0<=i<len(self):
+            raise IndexError('grid index out of range')
+        return (i%self.rows+1,i//self.rows+1)
+    def __contains__(self,cell):
+        try:
+            x,y=cell
+        except (TypeError,ValueError):
+            return False
+        return 1<=x<=self.rows and 1<=y<=self.cols
+    def __iter__(self):
+        for y in range(1,self.cols+1):
+            for x in range(1,self.rows+1):
+                yield (x,y)
+
+class cellSet:
+    '''
+    A set of cells of a rows x cols maze stored as one byte per cell.
+    '''
+    def __init__(self,rows,cols):
+        self.cols=cols
+        self._seen=bytearray(rows*cols)
+    def add(self,cell):
+        self._seen[(cell[0]-1)*self.cols+cell[1]-1]=1
+    def __contains__(self,cell):
+        return self._seen[(cell[0]-1)*self.cols+cell[1]-1]==1
+
+class parentMap(Mapping):
+    '''
+    Mapping of cell --> neighbouring cell it was reached from, stored as one
+    direction byte per cell. Used as maze.path while a compact maze is carved.
+    '''
+    _STEP={1:(0,1),2:(0,-1),3:(-1,0),4:(1,0)}
+    def __init__(self,rows,cols):
+        self.rows=rows
+        self.cols=cols
+        self._dir=bytearray(rows*cols)
+        self._len=0
+    def __setitem__(self,cell,parent):
+        i=(cell[0]-1)*self.cols+cell[1]-1
+        for d,(dx,dy) in self._STEP.items():
+            if (cell[0]+dx,cell[1]+dy)==tuple(parent):
+                break
+        else:
+            raise ValueError(f'{parent} is not a neighbour of {cell}')
+        if not self._dir[i]:
+            self._len+=1
+        self._dir[i]=d
+    def __getitem__(self,cell):
+        x,y=cell
+        if not (1<=x<=self.rows and 1<=y<=self.cols) or not self._dir[(x-1)*self.cols+y-1]:
+            raise KeyError(cell)
+        dx,dy=self._STEP[self._dir[(x-1)*self.cols+y-1]]
+        return (x+dx,y+dy)
+    def __iter__(self):
+        for y in range(1,self.cols+1):
+            for x in range(1,self.rows+1):
+                if self._dir[(x-1)*self.cols+y-1]:
+                    yield (x,y)
+    def __len__(self):
+        return self._len
+
+MAZE_MAGIC=b'PYAMAZE\x01'
+_MAZE_HEADER=struct.Struct('<8sII') # magic, rows, cols
+
+def writeMazeBinary(path,rows,cols,packed):
+    '''
+    Write a binary maze file: a 16 byte header (magic, rows, cols as little
+    endian uint32) followed by rows*cols bytes of walls in the wallMap
+    layout (row major, E=1, W=2, N=4, S=8, bit set=open).
+    '''
+    with open(path,'wb') as f:
+        f.write(_MAZE_HEADER.pack(MAZE_MAGIC,rows,cols))
+        f.write(packed)
+
+def readMazeBinary(path,access=mmap.ACCESS_COPY):
+    '''
+    Map a binary maze file into memory without parsing it.
+    Returns rows, cols and a writable memoryview of the walls. Writes go to
+    a private copy of the pages, the file itself is never modified.
+    access-->   mmap.ACCESS_READ for a read-only view instead.
+    '''
+    with open(path,'rb') as f:
+        magic,rows,cols=_MAZE_HEADER.unpack(f.read(_MAZE_HEADER.size))
+        if magic!=MAZE_MAGIC:
+            raise ValueError(f'{path} is not a binary maze file!')
+        mm=mmap.mmap(f.fileno(),0,access=access)
+    end=_MAZE_HEADER.size+rows*cols
+    if len(mm)<end:
+        raise ValueError(f'{path} is truncated!')
+    return rows,cols,memoryview(mm)[_MAZE_HEADER.size:end]
+
+def readMazeCSV(path):
+    '''
+    Read a CSV maze file (as written by saveMaze) in a single pass.
+    Returns rows, cols and the walls packed as in the binary format.
+    The cells must be in the column major order saveMaze writes them in.
+    '''
+    byColumn=bytearray()
+    rows=None
+    with open(path,'r',newline='') as f:
+        r=csv.reader(f)
+        next(r)
+        for i in r:
+            c=i[0].split(',')
+            x=int(c[0].lstrip('('))
+            y=int(c[1].rstrip(')'))
+            if rows is None and y==2:
+                rows=len(byColumn)
+            n=len(byColumn)
+            if rows is not None and (x,y)!=(n%rows+1,n//rows+1) or rows is None and (x,y)!=(n+1,1):
+                raise ValueError(f'{path}: cell {(x,y)} is out of order')
+            byColumn.append((int(i[1]) and 1)|(int(i[2]) and 2)|(int(i[3]) and 4)|(int(i[4]) and 8))
+    if rows is None:
+        rows=len(byColumn)
+    cols=len(byColumn)//rows if rows else 0
+    if rows*cols!=len(byColumn):
+        raise ValueError(f'{path}: the last column is incomplete')
+    packed=bytearray(rows*cols)
+    for y in range(cols):
+        packed[y::cols]=byColumn[y*rows:(y+1)*rows]
+    return rows,cols,packed
+
+def readMazeFile(path):
+    '''
+    rows, cols and packed walls of a binary (detected by its magic) or CSV maze file.
+    '''
+    with open(path,'rb') as f:
+        binary=f.read(len(MAZE_MAGIC))==MAZE_MAGIC
+    return readMazeBinary(path) if binary else readMazeCSV(path)
+
+def csvToBinary(csvPath,binaryPath=None):
+    '''
+    Convert a CSV maze file to the binary format.
+    binaryPath defaults to the CSV path with a .maze extension.
+    '''
+    if binaryPath is None:
+        binaryPath=os.path.splitext(csvPath)[0]+'.maze'
+    rows,cols,packed=readMazeCSV(csvPath)
+    writeMazeBinary(binaryPath,rows,cols,packed)
+    return binaryPath
+
+def ellerRows(rows,cols,pattern=None):
+    '''
+    Generate a random perfect maze one row at a time with Eller's algorithm.
+    Yields rows bytearrays of cols wall bytes (wallMap layout: E=1, W=2,
+    N=4, S=8, bit set=open), top row first. Only the current row is kept,
+    so the working memory is O(cols) whatever the number of rows.
+    Each yielded row is reused for the next one, copy it to keep it.
+    pattern-->  'v' or 'h' for longer vertical/horizontal passages, as in
+                CreateMaze.
+    '''
+    if rows<1 or cols<1:
+        return
+    # A cell is joined to its east neighbour / dropped to the row below when its
+    # random byte is below the threshold: probability 1/2, or 3/4 and 1/4 to
+    # favour horizontal ('h') or vertical ('v') passages
+    p=pattern.lower()[:1] if pattern else None
+    join={'h':192,'v':64}.get(p,128)
+    drop={'h':64,'v':192}.get(p,128)
+    # parent[c] links column c to a column of the same set (union-find over
+    # the columns of the current row, rebuilt for every row)
+    parent=list(range(cols))
+    count=[0]*cols
+    firstDrop=[0]*cols
+    north=bytearray(cols) # N bits of the current row (drops of the row above)
+    row=bytearray(cols)
+    def find(c):
+        while parent[c]!=c:
+            parent[c]=parent[parent[c]]
+            c=parent[c]
+        return c
+    for r in range(rows):
+        last=r==rows-1
+        row[:]=north
+        # Join neighbouring cells of different sets, all of them in the last row
+        rand=random.randbytes(cols)
+        for c in range(cols-1):
+            if last or rand[c]<join:
+                a=find(c)
+                b=find(c+1)
+                if a!=b:
+                    parent[b]=a
+                    row[c]|=1
+                    row[c+1]|=2
+        if last:
+            yield row
+            return
+        # Drop at least one cell of every set to the row below
+        for c in range(cols):
+            parent[c]=find(c)
+            count[parent[c]]+=1
+        rand=random.randbytes(cols)
+        north=bytearray(cols)
+        for c in range(cols):
+            s=parent[c]
+            count[s]-=1
+            # The last cell of a set that has not dropped yet always drops
+            if rand[c]<drop or count[s]==0 and not firstDrop[s]:
+                if not firstDrop[s]:
+                    firstDrop[s]=c+1
+                row[c]|=8
+                north[c]=4
+        yield row
+        # Cells of the next row start in the set of the cell above them or alone
+        for c in range(cols):
+            s=parent[c]
+            parent[c]=firstDrop[s]-1 if north[c] else c
+        firstDrop=[0]*cols
+
+def writeEllerMaze(path,rows,cols,pattern=None):
+    '''
+    Stream a perfect maze generated by ellerRows straight into a binary maze
+    file, one row at a time, so mazes far larger than the memory can be
+    created. Load it with CreateMaze(loadMaze=path) or readMazeBinary.
+    '''
+    with open(path,'wb') as f:
+        f.write(_MAZE_HEADER.pack(MAZE_MAGIC,rows,cols))
+        for row in ellerRows(rows,cols,pattern):
+            f.write(row)
+    return path
+
 class agent:
     '''
     The agents can be placed on the maze.
@@ -64,6 +650,9 @@ class agent:
                     This option doesn't matter for arrow shape.
         footprints-->   When the aganet will move to some other cell, its footprints
                         on the previous cell can be placed by making this True
+                        footprints='line' draws the whole trail as one growing
+                        line instead, so the agent keeps two canvas items
+                        however long its path is
         color-->    Color of the agent.
         
         _orient-->  You don't need to pass this
@@ -74,6 +663,14 @@ class agent:
                     It is actually the agent.
         _body-->    You don't need to pass this
                     Tracks the body of the agent (the previous positions of it)
+        _trail-->   You don't need to pass this
+                    The trail line of footprints='line'
+        _tag-->     You don't need to pass this
+                    Canvas tag of all items of the agent, so they can be
+                    deleted in one call
+
+        An agent placed on a headless maze only keeps track of its position,
+        nothing is drawn for it.
         '''
         self._parentMaze=parentMaze
         self.color=color
@@ -85,11 +682,13 @@ class agent:
         self.filled=filled
         self.shape=shape
         self._orient=0
+        self._trail=None
+        self._tag=f'agent{len(parentMaze._agents)}'
+        self.footprints=footprints
         if x is None:x=parentMaze.rows
         if y is None:y=parentMaze.cols
         self.x=x
         self.y=y
-        self.footprints=footprints
         self._parentMaze._agents.append(self)
         if goal==None:
             self.goal=self._parentMaze._goal
@@ -110,6 +709,8 @@ class agent:
     @y.setter
     def y(self,newY):
         self._y=newY
+        if self._parentMaze.headless:
+            return
         w=self._parentMaze._cell_width
         x=self.x*w-w+self._parentMaze._LabWidth
         y=self.y*w-w+self._parentMaze._LabWidth
@@ -124,6 +725,9 @@ class agent:
         if(hasattr(self,'_head')):
             if self.footprints is False:
                 self._parentMaze._canvas.delete(self._head)
+            elif self.footprints=='line':
+                self._parentMaze._canvas.delete(self._head)
+                self._extendTrail(y+w/2,x+w/2)
             else:
                 if self.shape=='square':
                     self._parentMaze._canvas.itemconfig(self._head, fill=self.color.value[1],outline="")
@@ -146,13 +750,13 @@ class agent:
                 self._body.append(self._head)
             if not self.filled or self.shape=='arrow':
                 if self.shape=='square':
-                    self._head=self._parentMaze._canvas.create_rectangle(*self._coord,fill=self.color.value[0],outline='') #stipple='gray75'
+                    self._head=self._parentMaze._canvas.create_rectangle(*self._coord,fill=self.color.value[0],outline='',tags=self._tag) #stipple='gray75'
                     try:
                         self._parentMaze._canvas.tag_lower(self._head,'ov')
                     except:
                         pass
                 else:
-                    self._head=self._parentMaze._canvas.create_line(*self._coord,fill=self.color.value[0],arrow=FIRST,arrowshape=(3/10*w,4/10*w,4/10*w))#,outline=self.color.name)
+                    self._head=self._parentMaze._canvas.create_line(*self._coord,fill=self.color.value[0],arrow=_tkinter().FIRST,arrowshape=(3/10*w,4/10*w,4/10*w),tags=self._tag)#,outline=self.color.name)
                     try:
                         self._parentMaze._canvas.tag_lower(self._head,'ov')
                     except:
@@ -169,19 +773,39 @@ class agent:
                         self._RCCW()
                         self._orient+=2
             else:
-                self._head=self._parentMaze._canvas.create_rectangle(*self._coord,fill=self.color.value[0],outline='')#stipple='gray75'
+                self._head=self._parentMaze._canvas.create_rectangle(*self._coord,fill=self.color.value[0],outline='',tags=self._tag)#stipple='gray75'
                 try:
                     self._parentMaze._canvas.tag_lower(self._head,'ov')
                 except:
                         pass
                 self._parentMaze._redrawCell(self.x,self.y,theme=self._parentMaze.theme)
         else:
-            self._head=self._parentMaze._canvas.create_rectangle(*self._coord,fill=self.color.value[0],outline='')#stipple='gray75'
+            self._head=self._parentMaze._canvas.create_rectangle(*self._coord,fill=self.color.value[0],outline='',tags=self._tag)#stipple='gray75'
             try:
                 self._parentMaze._canvas.tag_lower(self._head,'ov')
             except:
                 pass
             self._parentMaze._redrawCell(self.x,self.y,theme=self._parentMaze.theme)
+        self._lastCentre=(y+w/2,x+w/2)
+    def _extendTrail(self,y,x):
+        '''
+        Add the canvas point y,x (centre of the new cell) to the trail line of
+        footprints='line', creating it from the previous cell on the first move.
+        Points are appended in place, not by resending the whole line.
+        '''
+        canvas=self._parentMaze._canvas
+        if (y,x)==self._lastCentre:
+            return
+        if self._trail is None:
+            w=self._parentMaze._cell_width
+            self._trail=canvas.create_line(*self._lastCentre,y,x,fill=self.color.value[1],width=max(1,w/4),
+                                           capstyle='round',joinstyle='round',tags=self._tag)
+            try:
+                canvas.tag_lower(self._trail,'ov')
+            except:
+                pass
+        else:
+            canvas.insert(self._trail,'end',(y,x))
     @property
     def position(self):
         return (self.x,self.y)
@@ -261,33 +885,52 @@ class textLabel:
         self._parentMaze=parentMaze
         # self._parentMaze._labels.append(self)
         self._var=None
-        self.drawLabel()
+        if not parentMaze.headless:
+            self.drawLabel()
     @property
     def value(self):
         return self._value
     @value.setter
     def value(self,v):
         self._value=v
-        self._var.set(f'{self.title} : {v}')
+        if self._var is not None:
+            self._var.set(f'{self.title} : {v}')
     def drawLabel(self):
-        self._var = StringVar()
-        self.lab = Label(self._parentMaze._canvas, textvariable=self._var, bg="white", fg="black",font=('Helvetica bold',12),relief=RIDGE)
+        tk=_tkinter()
+        self._var = tk.StringVar()
+        self.lab = tk.Label(self._parentMaze._canvas, textvariable=self._var, bg="white", fg="black",font=('Helvetica bold',12),relief=tk.RIDGE)
         self._var.set(f'{self.title} : {self.value}')
-        self.lab.pack(expand = True,side=LEFT,anchor=NW)
+        self.lab.pack(expand = True,side=tk.LEFT,anchor=tk.NW)
 
 class maze:
     '''
     This is the main class to create maze.
     '''
-    def __init__(self,rows=10,cols=10):
+    # Sets one wall of a maze_map cell (walls,direction,value). While CreateMaze
+    # carves a dictionary maze it is dict.__setitem__, so the writes skip the
+    # per-write version count and CreateMaze counts them once at the end.
+    _setWall=staticmethod(operator.setitem)
+    def __init__(self,rows=10,cols=10,headless=False,compact=False):
         '''
         rows--> No. of rows of the maze
         cols--> No. of columns of the maze
+        headless--> True to never create the Tkinter window. The maze can
+                    still be generated, loaded, saved and searched, but
+                    nothing is drawn and tracePath/run do nothing.
+        compact-->  True to store the walls in a wallMap (one byte per cell)
+                    instead of a dictionary of dictionaries. maze_map[cell]['N']
+                    reads/writes work the same, grid becomes a gridCells view
+                    and, for perfect mazes, path only keeps the cells from the
+                    bottom right corner to the goal.
         Need to pass just the two arguments. The rest will be assigned automatically
         maze_map--> Will be set to a Dicationary. Keys will be cells and
                     values will be another dictionary with keys=['E','W','N','S'] for
                     East West North South and values will be 0 or 1. 0 means that 
                     direction(EWNS) is blocked. 1 means that direction is open.
+                    It is a wallDict (or a wallMap for compact mazes) whose
+                    version changes with every wall edit. A dictionary
+                    assigned to it is kept as it is; a plain one has no
+                    version, so searches cache nothing about it.
         grid--> A list of all cells
         path--> Shortest path from start(bottom right) to goal(by default top left)
                 It will be a dictionary
@@ -300,7 +943,9 @@ class maze:
         '''
         self.rows=rows
         self.cols=cols
-        self.maze_map={}
+        self.headless=headless
+        self.compact=compact
+        self.maze_map=wallDict()
         self.grid=[]
         self.path={} 
         self._cell_width=50  
@@ -309,41 +954,65 @@ class maze:
         self._agents=[]
         self.markCells=[]
 
+    @property
+    def maze_map(self):
+        return self._maze_map
+    @maze_map.setter
+    def maze_map(self,m):
+        self._maze_map=m
+
     @property
     def grid(self):
         return self._grid
     @grid.setter        
     def grid(self,n):
-        self._grid=[]
+        if self.compact:
+            self._grid=gridCells(self.rows,self.cols)
+            self.maze_map=wallMap(self.rows,self.cols)
+            return
+        cells=self._grid=[]
+        walls=self.maze_map
+        if not isinstance(walls,wallDict) or walls.version is None:
+            walls=self.maze_map=wallDict()
+        # The cells are stored directly and counted as one change of maze_map
+        put=dict.__setitem__
         y=0
-        for n in range(self.cols):
-            x = 1
-            y = 1+y
-            for m in range(self.rows):
-                self.grid.append((x,y))
-                self.maze_map[x,y]={'E':0,'W':0,'N':0,'S':0}
-                x = x + 1 
+        with _gcPaused():
+            for n in range(self.cols):
+                x = 1
+                y = 1+y
+                for m in range(self.rows):
+                    cells.append((x,y))
+                    cell=cellDict(E=0,W=0,N=0,S=0)
+                    cell._owner=walls
+                    put(walls,(x,y),cell)
+                    x = x + 1 
+        walls.version+=1
     def _Open_East(self,x, y):
         '''
         To remove the East Wall of the cell
         '''
-        self.maze_map[x,y]['E']=1
+        walls,setWall=self._maze_map,self._setWall
+        setWall(walls[x,y],'E',1)
         if y+1<=self.cols:
-            self.maze_map[x,y+1]['W']=1
+            setWall(walls[x,y+1],'W',1)
     def _Open_West(self,x, y):
-        self.maze_map[x,y]['W']=1
+        walls,setWall=self._maze_map,self._setWall
+        setWall(walls[x,y],'W',1)
         if y-1>0:
-            self.maze_map[x,y-1]['E']=1
+            setWall(walls[x,y-1],'E',1)
     def _Open_North(self,x, y):
-        self.maze_map[x,y]['N']=1
+        walls,setWall=self._maze_map,self._setWall
+        setWall(walls[x,y],'N',1)
         if x-1>0:
-            self.maze_map[x-1,y]['S']=1
+            setWall(walls[x-1,y],'S',1)
     def _Open_South(self,x, y):
-        self.maze_map[x,y]['S']=1
+        walls,setWall=self._maze_map,self._setWall
+        setWall(walls[x,y],'S',1)
         if x+1<=self.rows:
-            self.maze_map[x+1,y]['N']=1
+            setWall(walls[x+1,y],'N',1)
     
-    def CreateMaze(self,x=1,y=1,pattern=None,loopPercent=0,saveMaze=False,loadMaze=None,theme:COLOR=COLOR.dark):
+    def CreateMaze(self,x=1,y=1,pattern=None,loopPercent=0,saveMaze=False,loadMaze=None,theme:COLOR=COLOR.dark,algorithm='backtracker'):
         '''
         One very important function to create a Random Maze
         pattern-->  It can be 'v' for vertical or 'h' for horizontal
@@ -353,11 +1022,22 @@ class maze:
                         Higher value means there will be multiple paths (loops)
                         Higher the value (max 100) more will be the loops
         saveMaze--> To save the generated Maze as CSV file for future reference.
+                    See saveBinary for the compact binary format.
         loadMaze--> Provide the CSV file to generate a desried maze
+                    A binary file from saveBinary/csvToBinary can be given
+                    instead. A compact maze maps it into memory directly.
         theme--> Dark or Light
+        algorithm-->    'backtracker' (default) carves the maze from the goal with
+                        a recursive backtracker, whose stack can hold every cell.
+                        'eller' builds it row by row with Eller's algorithm
+                        (see ellerRows) in O(cols) working memory; the path is
+                        then found by a search as for loaded mazes. Use
+                        writeEllerMaze to stream a maze too big for memory to a file.
         '''
+        if algorithm not in ('backtracker','eller'):
+            raise ValueError(f'{algorithm} is not a valid maze generation algorithm!')
         _stack=[]
-        _closed=[]
+        _closed=cellSet(self.rows,self.cols) if self.compact and algorithm=='backtracker' else set()
         self.theme=theme
         self._goal=(x,y)
         if(isinstance(theme,str)):
@@ -365,37 +1045,44 @@ class maze:
                 self.theme=COLOR[theme]
             else:
                 raise ValueError(f'{theme} is not a valid theme COLOR!')
+        def inGrid(cell):
+            '''
+            O(1) replacement of "cell in self.grid" (grid is the full rectangle)
+            '''
+            return 1<=cell[0]<=self.rows and 1<=cell[1]<=self.cols
         def blockedNeighbours(cell):
             n=[]
-            for d in self.maze_map[cell].keys():
-                if self.maze_map[cell][d]==0:
-                    if d=='E' and (cell[0],cell[1]+1) in self.grid:
+            walls=self._maze_map[cell]
+            for d in walls.keys():
+                if walls[d]==0:
+                    if d=='E' and inGrid((cell[0],cell[1]+1)):
                         n.append((cell[0],cell[1]+1))
-                    elif d=='W' and (cell[0],cell[1]-1) in self.grid:
+                    elif d=='W' and inGrid((cell[0],cell[1]-1)):
                         n.append((cell[0],cell[1]-1))
-                    elif d=='N' and (cell[0]-1,cell[1]) in self.grid:
+                    elif d=='N' and inGrid((cell[0]-1,cell[1])):
                         n.append((cell[0]-1,cell[1]))
-                    elif d=='S' and (cell[0]+1,cell[1]) in self.grid:
+                    elif d=='S' and inGrid((cell[0]+1,cell[1])):
                         n.append((cell[0]+1,cell[1]))
             return n
         def removeWallinBetween(cell1,cell2):
             '''
             To remove wall in between two cells
             '''
+            setWall=self._setWall
             if cell1[0]==cell2[0]:
                 if cell1[1]==cell2[1]+1:
-                    self.maze_map[cell1]['W']=1
-                    self.maze_map[cell2]['E']=1
+                    setWall(self._maze_map[cell1],'W',1)
+                    setWall(self._maze_map[cell2],'E',1)
                 else:
-                    self.maze_map[cell1]['E']=1
-                    self.maze_map[cell2]['W']=1
+                    setWall(self._maze_map[cell1],'E',1)
+                    setWall(self._maze_map[cell2],'W',1)
             else:
                 if cell1[0]==cell2[0]+1:
-                    self.maze_map[cell1]['N']=1
-                    self.maze_map[cell2]['S']=1
+                    setWall(self._maze_map[cell1],'N',1)
+                    setWall(self._maze_map[cell2],'S',1)
                 else:
-                    self.maze_map[cell1]['S']=1
-                    self.maze_map[cell2]['N']=1
+                    setWall(self._maze_map[cell1],'S',1)
+                    setWall(self._maze_map[cell2],'N',1)
         def isCyclic(cell1,cell2):
             '''
             To avoid too much blank(clear) path.
@@ -403,19 +1090,19 @@ class maze:
             ans=False
             if cell1[0]==cell2[0]:
                 if cell1[1]>cell2[1]: cell1,cell2=cell2,cell1
-                if self.maze_map[cell1]['S']==1 and self.maze_map[cell2]['S']==1:
-                    if (cell1[0]+1,cell1[1]) in self.grid and self.maze_map[(cell1[0]+1,cell1[1])]['E']==1:
+                if self._maze_map[cell1]['S']==1 and self._maze_map[cell2]['S']==1:
+                    if inGrid((cell1[0]+1,cell1[1])) and self._maze_map[(cell1[0]+1,cell1[1])]['E']==1:
                         ans= True
-                if self.maze_map[cell1]['N']==1 and self.maze_map[cell2]['N']==1:
-                    if (cell1[0]-1,cell1[1]) in self.grid and self.maze_map[(cell1[0]-1,cell1[1])]['E']==1:
+                if self._maze_map[cell1]['N']==1 and self._maze_map[cell2]['N']==1:
+                    if inGrid((cell1[0]-1,cell1[1])) and self._maze_map[(cell1[0]-1,cell1[1])]['E']==1:
                         ans= True
             else:
                 if cell1[0]>cell2[0]: cell1,cell2=cell2,cell1
-                if self.maze_map[cell1]['E']==1 and self.maze_map[cell2]['E']==1:
-                    if (cell1[0],cell1[1]+1) in self.grid and self.maze_map[(cell1[0],cell1[1]+1)]['S']==1:
+                if self._maze_map[cell1]['E']==1 and self._maze_map[cell2]['E']==1:
+                    if inGrid((cell1[0],cell1[1]+1)) and self._maze_map[(cell1[0],cell1[1]+1)]['S']==1:
                         ans= True
-                if self.maze_map[cell1]['W']==1 and self.maze_map[cell2]['W']==1:
-                    if (cell1[0],cell1[1]-1) in self.grid and self.maze_map[(cell1[0],cell1[1]-1)]['S']==1:
+                if self._maze_map[cell1]['W']==1 and self._maze_map[cell2]['W']==1:
+                    if inGrid((cell1[0],cell1[1]-1)) and self._maze_map[(cell1[0],cell1[1]-1)]['S']==1:
                         ans= True
             return ans
         def AS(cell):
@@ -432,22 +1119,23 @@ class maze:
             visited = {(self.rows,self.cols)}
             while len(frontier) > 0:
                 cell = frontier.popleft()
-                if self.maze_map[cell]['W'] and (cell[0],cell[1]-1) not in visited:
+                walls = self.maze_map[cell]
+                if walls['W'] and (cell[0],cell[1]-1) not in visited:
                     nextCell = (cell[0],cell[1]-1)
                     path[nextCell] = cell
                     frontier.append(nextCell)
                     visited.add(nextCell)
-                if self.maze_map[cell]['S'] and (cell[0]+1,cell[1]) not in visited:    
+                if walls['S'] and (cell[0]+1,cell[1]) not in visited:    
                     nextCell = (cell[0]+1,cell[1])
                     path[nextCell] = cell
                     frontier.append(nextCell)
                     visited.add(nextCell)
-                if self.maze_map[cell]['E'] and (cell[0],cell[1]+1) not in visited:
+                if walls['E'] and (cell[0],cell[1]+1) not in visited:
                     nextCell = (cell[0],cell[1]+1)
                     path[nextCell] = cell
                     frontier.append(nextCell)
                     visited.add(nextCell)
-                if self.maze_map[cell]['N'] and (cell[0]-1,cell[1]) not in visited:
+                if walls['N'] and (cell[0]-1,cell[1]) not in visited:
                     nextCell = (cell[0]-1,cell[1])
                     path[nextCell] = cell
                     frontier.append(nextCell)
@@ -464,8 +1152,30 @@ class maze:
             return fwdPath
         # if maze is to be generated randomly
         if not loadMaze:
-            _stack.append((x,y))
-            _closed.append((x,y))
+            if isinstance(self.maze_map,wallDict):
+                self._setWall=dict.__setitem__
+            if algorithm=='eller':
+                # Rows are written into maze_map as they are generated, the
+                # backtracker below has nothing to carve
+                cols=self.cols
+                walls=self.maze_map
+                if not self.compact and (not isinstance(walls,wallDict) or walls.version is None):
+                    walls=self.maze_map=wallDict()
+                put=dict.__setitem__
+                with _gcPaused():
+                    for r,row in enumerate(ellerRows(self.rows,cols,pattern)):
+                        if self.compact:
+                            walls.bits[r*cols:(r+1)*cols]=row
+                        else:
+                            for c,b in enumerate(row):
+                                cell=cellDict(E=b&1 and 1,W=b>>1&1,N=b>>2&1,S=b>>3&1)
+                                cell._owner=walls
+                                put(walls,(r+1,c+1),cell)
+            else:
+                if self.compact:
+                    self.path=parentMap(self.rows,self.cols)
+                _stack.append((x,y))
+                _closed.add((x,y))
             biasLength=2 # if pattern is 'v' or 'h'
             if(pattern is not None and pattern.lower()=='h'):
                 biasLength=max(self.cols//10,2)
@@ -476,13 +1186,15 @@ class maze:
             while len(_stack) > 0:
                 cell = []
                 bias+=1
-                if(x , y +1) not in _closed and (x , y+1) in self.grid:
+                # _closed is a set and the grid is always the full rectangle,
+                # so both checks are O(1) and the random choices are unchanged
+                if y+1<=self.cols and (x , y+1) not in _closed:
                     cell.append("E")
-                if (x , y-1) not in _closed and (x , y-1) in self.grid:
+                if y-1>=1 and (x , y-1) not in _closed:
                     cell.append("W")
-                if (x+1, y ) not in _closed and (x+1 , y ) in self.grid:
+                if x+1<=self.rows and (x+1, y ) not in _closed:
                     cell.append("S")
-                if (x-1, y ) not in _closed and (x-1 , y) in self.grid:
+                if x-1>=1 and (x-1, y ) not in _closed:
                     cell.append("N") 
                 if len(cell) > 0:    
                     if pattern is not None and pattern.lower()=='h' and bias<=biasLength:
@@ -500,32 +1212,40 @@ class maze:
                         self._Open_East(x,y)
                         self.path[x, y+1] = x, y
                         y = y + 1
-                        _closed.append((x, y))
+                        _closed.add((x, y))
                         _stack.append((x, y))
 
                     elif current_cell == "W":
                         self._Open_West(x, y)
                         self.path[x , y-1] = x, y
                         y = y - 1
-                        _closed.append((x, y))
+                        _closed.add((x, y))
                         _stack.append((x, y))
 
                     elif current_cell == "N":
                         self._Open_North(x, y)
                         self.path[(x-1 , y)] = x, y
                         x = x - 1
-                        _closed.append((x, y))
+                        _closed.add((x, y))
                         _stack.append((x, y))
 
                     elif current_cell == "S":
                         self._Open_South(x, y)
                         self.path[(x+1 , y)] = x, y
                         x = x + 1
-                        _closed.append((x, y))
+                        _closed.add((x, y))
                         _stack.append((x, y))
 
                 else:
                     x, y = _stack.pop()
+            if self.compact and loopPercent==0 and algorithm=='backtracker':
+                # Keep only the chain from the bottom right corner to the goal
+                fwd={}
+                cell=(self.rows,self.cols)
+                while cell!=self._goal:
+                    fwd[cell]=self.path[cell]
+                    cell=fwd[cell]
+                self.path=fwd
 
             ## Multiple Path Loops
             if loopPercent!=0:
@@ -535,7 +1255,8 @@ class maze:
                 while x!=self.rows or y!=self.cols:
                     x,y=self.path[(x,y)]
                     pathCells.append((x,y))
-                notPathCells=[i for i in self.grid if i not in pathCells]
+                onPath=set(pathCells)
+                notPathCells=[i for i in self.grid if i not in onPath]
                 random.shuffle(pathCells)
                 random.shuffle(notPathCells)
                 pathLength=len(pathCells)
@@ -546,8 +1267,9 @@ class maze:
                 count=0
                 i=0
                 while count<count1: #these many blocks to remove
-                    if len(blockedNeighbours(pathCells[i]))>0:
-                        cell=random.choice(blockedNeighbours(pathCells[i]))
+                    blocked=blockedNeighbours(pathCells[i])
+                    if len(blocked)>0:
+                        cell=random.choice(blocked)
                         if not isCyclic(cell,pathCells[i]):
                             removeWallinBetween(cell,pathCells[i])
                             count+=1
@@ -562,8 +1284,9 @@ class maze:
                     count=0
                     i=0
                     while count<count2: #these many blocks to remove
-                        if len(blockedNeighbours(notPathCells[i]))>0:
-                            cell=random.choice(blockedNeighbours(notPathCells[i]))
+                        blocked=blockedNeighbours(notPathCells[i])
+                        if len(blocked)>0:
+                            cell=random.choice(blocked)
                             if not isCyclic(cell,notPathCells[i]):
                                 removeWallinBetween(cell,notPathCells[i])
                                 count+=1
@@ -574,27 +1297,35 @@ class maze:
                         if i==len(notPathCells):
                             break
                 self.path=AS((self.rows,self.cols))
+            elif algorithm=='eller':
+                self.path=AS((self.rows,self.cols))
         else:
-            # Load maze from CSV file
-            with open(loadMaze,'r') as f:
-                last=list(f.readlines())[-1]
-                c=last.split(',')
-                c[0]=int(c[0].lstrip('"('))
-                c[1]=int(c[1].rstrip(')"'))
-                self.rows=c[0]
-                self.cols=c[1]
+            # Load maze from a binary or CSV file
+            self.rows,self.cols,packed=readMazeFile(loadMaze)
+            if self.compact:
                 self.grid=[]
-
-            with open(loadMaze,'r') as f:
-                r=csv.reader(f)
-                next(r)
-                for i in r:
-                    c=i[0].split(',')
-                    c[0]=int(c[0].lstrip('('))
-                    c[1]=int(c[1].rstrip(')'))
-                    self.maze_map[tuple(c)]={'E':int(i[1]),'W':int(i[2]),'N':int(i[3]),'S':int(i[4])}
+                self.maze_map=wallMap(self.rows,self.cols,bits=packed)
+            else:
+                self.maze_map=wallDict()
+                self.grid=[]
+                walls=self.maze_map
+                put=dict.__setitem__
+                i=0
+                with _gcPaused():
+                    for x in range(1,self.rows+1):
+                        for y in range(1,self.cols+1):
+                            b=packed[i]
+                            cell=cellDict(E=b&1 and 1,W=b>>1&1,N=b>>2&1,S=b>>3&1)
+                            cell._owner=walls
+                            put(walls,(x,y),cell)
+                            i+=1
             self.path=AS((self.rows,self.cols))
-        self._drawMaze(self.theme)
+        # Walls written directly above count as one change of maze_map
+        self.__dict__.pop('_setWall',None)
+        if getattr(self.maze_map,'version',None) is not None:
+            self.maze_map.version+=1
+        if not self.headless:
+            self._drawMaze(self.theme)
         agent(self,*self._goal,shape='square',filled=True,color=COLOR.green)
         if saveMaze:
             dt_string = datetime.datetime.now().strftime("%Y-%m-%d--%H-%M-%S")
@@ -610,21 +1341,83 @@ class maze:
                 f.seek(f.tell()-2, os.SEEK_SET)
                 f.truncate()
     
+    def packWalls(self):
+        '''
+        The walls of all cells as bytes, one byte per cell in row major order
+        with the wallMap bit layout (E=1, W=2, N=4, S=8, bit set=open).
+        '''
+        if isinstance(self.maze_map,wallMap):
+            return bytes(self.maze_map.bits)
+        if isinstance(self.maze_map,tiledWallMap):
+            return self.maze_map.packed()
+        packed=bytearray(self.rows*self.cols)
+        i=0
+        for x in range(1,self.rows+1):
+            for y in range(1,self.cols+1):
+                walls=self.maze_map[x,y]
+                packed[i]=(walls['E'] and 1)|(walls['W'] and 2)|(walls['N'] and 4)|(walls['S'] and 8)
+                i+=1
+        return bytes(packed)
+
+    def loadTiled(self,path,tileSize=256,cacheTiles=64):
+        '''
+        Use a binary maze file (e.g. from writeEllerMaze) without loading it:
+        maze_map becomes a read-only tiledWallMap paging in tiles of walls on
+        demand, grid a gridCells view. Meant for headless mazes too big for
+        the memory, so no path is computed and nothing is drawn.
+        '''
+        wmap=tiledWallMap(path,tileSize,cacheTiles)
+        self.rows,self.cols=wmap.rows,wmap.cols
+        self.compact=True
+        self._grid=gridCells(self.rows,self.cols)
+        self.maze_map=wmap
+        self.path={}
+        return wmap
+
+    def saveBinary(self,path=None):
+        '''
+        Save the maze in the binary format (header + one byte of wall bits per
+        cell) that CreateMaze(loadMaze=...) can map into memory.
+        path defaults to maze--<date time>.maze like the CSV files.
+        '''
+        if path is None:
+            dt_string = datetime.datetime.now().strftime("%Y-%m-%d--%H-%M-%S")
+            path=f'maze--{dt_string}.maze'
+        writeMazeBinary(path,self.rows,self.cols,self.packWalls())
+        return path
+
+    def fingerprint(self):
+        '''
+        Content hash (hex string) of the maze size and walls.
+        Two mazes with the same walls have the same fingerprint whatever their
+        storage (dictionary or compact). It is recomputed only after maze_map
+        is replaced or changed.
+        '''
+        version=self.maze_map.version
+        cached=getattr(self,'_fingerprint',None)
+        if cached is not None and cached[0] is self.maze_map and cached[1]==version:
+            return cached[2]
+        h=hashlib.sha1(f'{self.rows}x{self.cols}:'.encode())
+        h.update(self.packWalls())
+        self._fingerprint=(self.maze_map,version,h.hexdigest())
+        return self._fingerprint[2]
+
     def _drawMaze(self,theme):
         '''
         Creation of Tkinter window and maze lines
         '''
         
         self._LabWidth=26 # Space from the top for Labels
-        self._win=Tk()
+        tk=_tkinter()
+        self._win=tk.Tk()
         self._win.state('zoomed')
         self._win.title('PYTHON MAZE WORLD by Learning Orbis')
         
         scr_width=self._win.winfo_screenwidth()
         scr_height=self._win.winfo_screenheight()
         self._win.geometry(f"{scr_width}x{scr_height}+0+0")
-        self._canvas = Canvas(width=scr_width, height=scr_height, bg=theme.value[0]) # 0,0 is top left corner
-        self._canvas.pack(expand=YES, fill=BOTH)
+        self._canvas = tk.Canvas(width=scr_width, height=scr_height, bg=theme.value[0]) # 0,0 is top left corner
+        self._canvas.pack(expand=tk.YES, fill=tk.BOTH)
         # Some calculations for calculating the width of the maze cell
         k=3.25
         if self.rows>=95 and self.cols>=95:
@@ -641,22 +1434,45 @@ class maze:
             k=3
         self._cell_width=round(min(((scr_height-self.rows-k*self._LabWidth)/(self.rows)),((scr_width-self.cols-k*self._LabWidth)/(self.cols)),90),3)
         
-        # Creating Maze lines
+        # Creating Maze lines (one canvas line per straight run of walls)
         if self._win is not None:
             if self.grid is not None:
-                for cell in self.grid:
-                    x,y=cell
-                    w=self._cell_width
-                    x=x*w-w+self._LabWidth
-                    y=y*w-w+self._LabWidth
-                    if self.maze_map[cell]['E']==False:
-                        l=self._canvas.create_line(y + w, x, y + w, x + w,width=2,fill=theme.value[1],tag='line')
-                    if self.maze_map[cell]['W']==False:
-                        l=self._canvas.create_line(y, x, y, x + w,width=2,fill=theme.value[1],tag='line')
-                    if self.maze_map[cell]['N']==False:
-                        l=self._canvas.create_line(y, x, y + w, x,width=2,fill=theme.value[1],tag='line')
-                    if self.maze_map[cell]['S']==False:
-                        l=self._canvas.create_line(y, x + w, y + w, x + w,width=2,fill=theme.value[1],tag='line')
+                w=self._cell_width
+                for x1,y1,x2,y2 in self._wallSegments():
+                    self._canvas.create_line(x1*w+self._LabWidth,y1*w+self._LabWidth,x2*w+self._LabWidth,y2*w+self._LabWidth,
+                                             width=2,fill=theme.value[1],tag='line')
+
+    def _wallSegments(self):
+        '''
+        The closed walls as (x1,y1,x2,y2) canvas segments in cell units
+        (x along the columns, y along the rows, 0,0 is the top left corner).
+        A wall shared by two cells is drawn once if either side is closed,
+        and walls continuing on the same line are merged into one segment.
+        '''
+        walls=self.packWalls()
+        rows,cols=self.rows,self.cols
+        segments=[]
+        # Horizontal lines: line i runs between rows i and i+1 (0 is the top edge)
+        for i in range(rows+1):
+            start=None
+            for c in range(cols+1):
+                closed=c<cols and ((i>0 and not walls[(i-1)*cols+c]&8) or (i<rows and not walls[i*cols+c]&4))
+                if closed and start is None:
+                    start=c
+                elif not closed and start is not None:
+                    segments.append((start,i,c,i))
+                    start=None
+        # Vertical lines: line j runs between columns j and j+1 (0 is the left edge)
+        for j in range(cols+1):
+            start=None
+            for r in range(rows+1):
+                closed=r<rows and ((j>0 and not walls[r*cols+j-1]&1) or (j<cols and not walls[r*cols+j]&2))
+                if closed and start is None:
+                    start=r
+                elif not closed and start is not None:
+                    segments.append((j,start,j,r))
+                    start=None
+        return segments
 
     def _redrawCell(self,x,y,theme):
         '''
@@ -698,195 +1514,125 @@ class maze:
 
 
     _tracePathList=[]
-    def _tracePathSingle(self,a,p,kill,showMarked,delay):
+    def _tracePathSingle(self,a,p,kill,showMarked,delay,step=1,i=0):
         '''
         An interal method to help tracePath method for tracing a path by agent.
+        p is not consumed: i is the position reached in a list or string path
+        (a dictionary path is followed from the agent's cell). Each call moves
+        the agent by up to step cells and schedules the next one, so every
+        cell costs O(1) work. With step=1 turning an arrow agent takes a call
+        of its own as it always did; with larger steps it turns on the way.
         '''
-        
-        def killAgent(a):
-            '''
-            if the agent should be killed after it reaches the Goal or completes the path
-            '''
-            for i in range(len(a._body)):
-                self._canvas.delete(a._body[i])
-            self._canvas.delete(a._head) 
-        w=self._cell_width
-        if((a.x,a.y) in self.markCells and showMarked):
-            w=self._cell_width
-            x=a.x*w-w+self._LabWidth
-            y=a.y*w-w+self._LabWidth
-            self._canvas.create_oval(y + w/2.5+w/20, x + w/2.5+w/20,y + w/2.5 +w/4-w/20, x + w/2.5 +w/4-w/20,fill='red',outline='red',tag='ov')
-            self._canvas.tag_raise('ov')
-       
-        if (a.x,a.y)==(a.goal):
-            del maze._tracePathList[0][0][a]
-            if maze._tracePathList[0][0]=={}:
-                del maze._tracePathList[0]
-                if len(maze._tracePathList)>0:
-                    self.tracePath(maze._tracePathList[0][0],kill=maze._tracePathList[0][1],delay=maze._tracePathList[0][2])
-            if kill:
-                self._win.after(300, killAgent,a)         
-            return
-        # If path is provided as Dictionary
-        if(type(p)==dict):
-            if(len(p)==0):
-                del maze._tracePathList[0][0][a]
+        moved=0
+        while True:
+            if((a.x,a.y) in self.markCells and showMarked):
+                w=self._cell_width
+                x=a.x*w-w+self._LabWidth
+                y=a.y*w-w+self._LabWidth
+                self._canvas.create_oval(y + w/2.5+w/20, x + w/2.5+w/20,y + w/2.5 +w/4-w/20, x + w/2.5 +w/4-w/20,fill='red',outline='red',tag='ov')
+                self._canvas.tag_raise('ov')
+            if (a.x,a.y)==(a.goal) or self._traceDone(a,p,i):
+                self._traceFinished(a,kill)
                 return
-            if a.shape=='arrow':
-                old=(a.x,a.y)
-                new=p[(a.x,a.y)]
-                o=a._orient
-                
-                if old!=new:
-                    if old[0]==new[0]:
-                        if old[1]>new[1]:
-                            mov=3#'W' #3
-                        else:
-                            mov=1#'E' #1
-                    else:
-                        if old[0]>new[0]:
-                            mov=0#'N' #0
+            i,isMove=self._traceAction(a,p,i)
+            if isMove:
+                moved+=1
+            if moved>=step or (step==1 and not isMove):
+                break
+        self._win.after(delay, self._tracePathSingle,a,p,kill,showMarked,delay,step,i)
 
-                        else:
-                            mov=2#'S' #2
-                    if mov-o==2:
-                        a._RCW()
-
-                    if mov-o==-2:
-                        a._RCW()
-                    if mov-o==1:
-                        a._RCW()
-                    if mov-o==-1:
-                        a._RCCW()
-                    if mov-o==3:
-                        a._RCCW()
-                    if mov-o==-3:
-                        a._RCW()
-                    if mov==o:
-                        a.x,a.y=p[(a.x,a.y)]
-                else:
-                    del p[(a.x,a.y)]
-            else:    
-                a.x,a.y=p[(a.x,a.y)]
-        # If path is provided as String
-        if (type(p)==str):
-            if(len(p)==0):
-                del maze._tracePathList[0][0][a]
-                if maze._tracePathList[0][0]=={}:
-                    del maze._tracePathList[0]
-                    if len(maze._tracePathList)>0:
-                        self.tracePath(maze._tracePathList[0][0],kill=maze._tracePathList[0][1],delay=maze._tracePathList[0][2])
-                if kill:
-                    
-                    self._win.after(300, killAgent,a)         
-                return
-            if a.shape=='arrow':
-                old=(a.x,a.y)
-                new=p[0]
-                o=a._orient
-                if new=='N': mov=0
-                elif new=='E': mov=1
-                elif new=='S': mov=2
-                elif new=='W': mov=3
-                
-                if mov-o==2:
-                    a._RCW()
+    def _traceDone(self,a,p,i):
+        '''
+        True once the agent reached the end of the path p.
+        A dictionary path ends at a cell without a next cell (or leading to itself).
+        '''
+        if type(p)==dict:
+            return p.get((a.x,a.y),(a.x,a.y))==(a.x,a.y)
+        return i>=len(p)
 
-                if mov-o==-2:
-                    a._RCW()
-                if mov-o==1:
-                    a._RCW()
-                if mov-o==-1:
-                    a._RCCW()
-                if mov-o==3:
-                    a._RCCW()
-                if mov-o==-3:
-                    a._RCW()
-            if a.shape=='square' or mov==o:    
-                move=p[0]
-                if move=='E':
-                    if a.y+1<=self.cols:
-                        a.y+=1
-                elif move=='W':
-                    if a.y-1>0:
-                        a.y-=1
-                elif move=='N':
-                    if a.x-1>0:
-                        a.x-=1
-                        a.y=a.y
-                elif move=='S':
-                    if a.x+1<=self.rows:
-                        a.x+=1
-                        a.y=a.y
-                elif move=='C':
-                    a._RCW()
-                elif move=='A':
+    def _traceAction(self,a,p,i):
+        '''
+        One action of the agent a along the path p from position i: a quarter
+        turn of an arrow agent (not yet facing the next cell), or a move.
+        Returns the new position in p and whether the agent moved.
+        '''
+        cell=(a.x,a.y)
+        if type(p)==str:
+            move=p[i]
+            if move=='C':
+                a._RCW()
+                return i+1,False
+            if move=='A':
+                a._RCCW()
+                return i+1,False
+            dx,dy=_MOVES[move]
+            new=(cell[0]+dx,cell[1]+dy)
+            if not (1<=new[0]<=self.rows and 1<=new[1]<=self.cols):
+                new=cell  # Moves out of the maze are skipped
+        elif type(p)==dict:
+            new=p[cell]
+        else:
+            new=p[i]
+        if new==cell:
+            return i+1,False
+        if a.shape=='arrow':
+            if new[0]==cell[0]:
+                mov=3 if new[1]<cell[1] else 1
+            else:
+                mov=0 if new[0]<cell[0] else 2
+            if mov!=a._orient:
+                if (mov-a._orient)%4==3:
                     a._RCCW()
-                p=p[1:]
-        # If path is provided as List
-        if (type(p)==list):
-            if(len(p)==0):
-                del maze._tracePathList[0][0][a]
-                if maze._tracePathList[0][0]=={}:
-                    del maze._tracePathList[0]
-                    if len(maze._tracePathList)>0:
-                        self.tracePath(maze._tracePathList[0][0],kill=maze._tracePathList[0][1],delay=maze._tracePathList[0][2])
-                if kill:                    
-                    self._win.after(300, killAgent,a)  
-                return
-            if a.shape=='arrow':
-                old=(a.x,a.y)
-                new=p[0]
-                o=a._orient
-                
-                if old!=new:
-                    if old[0]==new[0]:
-                        if old[1]>new[1]:
-                            mov=3#'W' #3
-                        else:
-                            mov=1#'E' #1
-                    else:
-                        if old[0]>new[0]:
-                            mov=0#'N' #0
-
-                        else:
-                            mov=2#'S' #2
-                    if mov-o==2:
-                        a._RCW()
-
-                    elif mov-o==-2:
-                        a._RCW()
-                    elif mov-o==1:
-                        a._RCW()
-                    elif mov-o==-1:
-                        a._RCCW()
-                    elif mov-o==3:
-                        a._RCCW()
-                    elif mov-o==-3:
-                        a._RCW()
-                    elif mov==o:
-                        a.x,a.y=p[0]
-                        del p[0]
                 else:
-                    del p[0]
-            else:    
-                a.x,a.y=p[0]
-                del p[0]
+                    a._RCW()
+                return i,False
+        a.x,a.y=new
+        return i+1,True
 
-        self._win.after(delay, self._tracePathSingle,a,p,kill,showMarked,delay)    
+    def _traceFinished(self,a,kill):
+        '''
+        The agent a finished its path: start the next queued tracePath once
+        every agent of the current one is done.
+        '''
+        def killAgent(a):
+            '''
+            if the agent should be killed after it reaches the Goal or completes the path
+            (all its items share its tag, so they go in one call)
+            '''
+            self._canvas.delete(a._tag)
+        del maze._tracePathList[0][0][a]
+        if maze._tracePathList[0][0]=={}:
+            del maze._tracePathList[0]
+            if len(maze._tracePathList)>0:
+                self.tracePath(maze._tracePathList[0][0],kill=maze._tracePathList[0][1],delay=maze._tracePathList[0][2],
+                               step=maze._tracePathList[0][3])
+        if kill:
+            self._win.after(300, killAgent,a)
 
-    def tracePath(self,d,kill=False,delay=300,showMarked=False):
+    def tracePath(self,d,kill=False,delay=300,showMarked=False,step=1):
         '''
         A method to trace path by agent
         You can provide more than one agent/path details
+        step-->     Number of cells the agents move every delay ms,
+                    so long paths can be shown in bounded time
         '''
-        self._tracePathList.append((d,kill,delay))
+        if self.headless:
+            return
+        self._tracePathList.append((d,kill,delay,step))
         if maze._tracePathList[0][0]==d: 
             for a,p in d.items():
                 if a.goal!=(a.x,a.y) and len(p)!=0:
-                    self._tracePathSingle(a,p,kill,showMarked,delay)
+                    self._tracePathSingle(a,p,kill,showMarked,delay,step)
     def run(self):
         '''
         Finally to run the Tkinter Main Loop
         '''
+        if self.headless:
+            return
         self._win.mainloop()
+
+if __name__=='__main__':
+    # python pyamaze.py maze1.csv [maze2.csv ...] converts CSV mazes to the binary format
+    import sys
+    for csvPath in sys.argv[1:]:
+        print(f'{csvPath} --> {csvToBinary(csvPath)}')
@@ -0,0 +1,51 @@
+import random
+import unittest
+
+import pyamaze as maze
+from SearchSolution import SearchSolution
+
+class CorridorSearchTest(unittest.TestCase):
+    # The corridor searches must find paths as short as bfs on looped mazes,
+    # where the start or goal can sit on a corridor that loops back to a node
+    def test_depth_matches_bfs_on_looped_mazes(self):
+        for seed in range(60):
+            random.seed(seed)
+            rows, cols = random.randint(2, 15), random.randint(2, 15)
+            m = maze.maze(rows, cols, headless=True)
+            m.CreateMaze(loopPercent=random.choice((30, 60, 100)))
+            for _ in range(10):
+                start = (random.randint(1, rows), random.randint(1, cols))
+                goal = (random.randint(1, rows), random.randint(1, cols))
+                bfs = SearchSolution(m)
+                bfs.bfs(start, goal)
+                for method in ('corridor_dijkstra', 'corridor_astar'):
+                    solver = SearchSolution(m)
+                    path = getattr(solver, method)(start, goal)
+                    with self.subTest(seed=seed, start=start, goal=goal, method=method):
+                        self.assertEqual(solver.depth, bfs.depth)
+                        self.assertEqual(path[0], start)
+                        self.assertEqual(path[-1], goal)
+
+    def test_goal_corridor_back_to_start_node(self):
+        random.seed(36)
+        m = maze.maze(14, 3, headless=True)
+        m.CreateMaze(loopPercent=30)
+        for method in ('corridor_dijkstra', 'corridor_astar'):
+            solver = SearchSolution(m)
+            self.assertEqual(getattr(solver, method)((2, 3), (1, 2)), [(2, 3), (1, 3), (1, 2)])
+
+class SameStartGoalTest(unittest.TestCase):
+    # Every method reports the same metrics when start is the goal, so the
+    # benchmark numbers can be compared across methods
+    def test_metrics(self):
+        random.seed(4)
+        m = maze.maze(8, 8, headless=True)
+        m.CreateMaze(loopPercent=40)
+        for method in SearchSolution.ALGORITHMS:
+            solver = SearchSolution(m)
+            with self.subTest(method=method):
+                self.assertEqual(solver.run(method, (3, 3), (3, 3)), [(3, 3)])
+                self.assertEqual((solver.depth, solver.numCreated, solver.numExpanded, solver.maxFringe), (0, 1, 1, 1))
+
+if __name__ == "__main__":
+    unittest.main()